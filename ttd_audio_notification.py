@@ -50,24 +50,30 @@ import logging.config
 import json
 import uuid
 import requests
+from requests.adapters import HTTPAdapter
 import psutil
 from subprocess import Popen, PIPE
 from ftplib import FTP, error_reply, error_temp, error_perm, error_proto
 import configparser
-from time import sleep, time
+from time import perf_counter, sleep, time, time_ns
 from datetime import datetime
 from dotenv import load_dotenv
 import shutil
 import gzip
 import itertools
+import heapq
+from operator import itemgetter
 import signal
 from threading import Thread, Lock, Event
 import argparse
 from enum import Enum
+from dataclasses import dataclass
 import math
 import pytz  # For timezone handling
 import re
 
+from ttd_logging import log_cleanup_due, record_log_cleanup
+
 # -----------------------------------------------------------------------------
 # Dependency Management
 # -----------------------------------------------------------------------------
@@ -107,8 +113,12 @@ max_log_days = int(config['ttd_audio_notification_Logging']['max_log_days'])
 # Ensure the log directory exists
 os.makedirs(log_dir, exist_ok=True)
 
+# Capture the start time once; the log file name and anything else stamped at 
+# startup reuse it instead of constructing a new datetime each time
+_STARTED_AT = datetime.now()
+
 # Define the log file path
-log_file_name = f"audio_notification_{datetime.now().strftime('%Y-%m-%d')}.log"
+log_file_name = f"audio_notification_{_STARTED_AT.strftime('%Y-%m-%d')}.log"
 log_file_path = os.path.join(log_dir, log_file_name)
 
 # Define a unique correlation ID for the script run
@@ -173,7 +183,7 @@ class JsonFormatter(logging.Formatter):
             log_record['retry_delay'] = record.retry_delay
         if record.exc_info:
             log_record['exception'] = self.formatException(record.exc_info)
-        return json.dumps(log_record)
+        return json.dumps(log_record, separators=(',', ':'))
 
 # Custom Handler with Compression and Error Handling
 from logging.handlers import TimedRotatingFileHandler
@@ -188,7 +198,7 @@ class GzTimedRotatingFileHandler(TimedRotatingFileHandler):
                         with open(s, 'rb') as f_in, gzip.open(f"{s}.gz", 'wb') as f_out:
                             shutil.copyfileobj(f_in, f_out)
                         os.remove(s)
-                        self.logger.info(f"Compressed and archived log file: {os.path.basename(s)}")
+                        self.logger.info("Compressed and archived log file: %s", os.path.basename(s))
         except Exception as e:
             self.logger.error("Error during log rollover and compression", exc_info=True)
 
@@ -250,6 +260,17 @@ error_list = []    # List to store non-critical error messages
 error_notification_timestamps = {}
 notification_lock = Lock()
 
+# -----------------------------------------------------------------------------
+# HTTP Session
+# -----------------------------------------------------------------------------
+# One pooled session for the webhook and Pushover calls, so retries and 
+# notifications reuse open connections instead of a new TCP+TLS handshake each.
+# urllib3 retries are disabled; send_webhook's retry loop stays in charge.
+http_session = requests.Session()
+http_adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=0)
+http_session.mount('https://', http_adapter)
+http_session.mount('http://', http_adapter)
+
 # -----------------------------------------------------------------------------
 # Function: get_current_timestamp
 # -----------------------------------------------------------------------------
@@ -285,15 +306,19 @@ def send_pushover_notification(message, title="Notification", priority=0, sound=
     - immediate (bool): If True, send the notification immediately without grouping.
     """
     try:
-        # Retrieve cooldown_period from config or use default
-        cooldown_period = config['ttd_audio_notification_Pushover'].getint('cooldown_period', fallback=300)  # seconds
+        if settings is None:
+            # Credentials are only trusted once log_and_validate_config() has run
+            logger.error("Pushover notification skipped, configuration not validated: %s - %s", title, message)
+            return
+
+        cooldown_period = settings.cooldown_period  # seconds
         now = time()
         
         if error_type and not immediate:
             with notification_lock:
                 last_sent = error_notification_timestamps.get(error_type.value, 0)
                 if now - last_sent < cooldown_period:
-                    logger.info(f"Notification for {error_type.value} suppressed to avoid overload.")
+                    logger.info("Notification for %s suppressed to avoid overload.", error_type.value)
                     return
                 else:
                     error_notification_timestamps[error_type.value] = now
@@ -301,27 +326,27 @@ def send_pushover_notification(message, title="Notification", priority=0, sound=
         full_title = f"{script_name}: {title}"
 
         payload = {
-            'token': config['Validated']['pushover_token'],
-            'user': config['Validated']['pushover_user'],
+            'token': settings.pushover_token,
+            'user': settings.pushover_user,
             'message': message,
             'title': full_title,
             'priority': priority,
-            'sound': sound or config['ttd_audio_notification_Pushover']['sound']
+            'sound': sound or settings.sound
         }
 
         if priority == 2:
             # Emergency priority requires 'retry' and 'expire' parameters
-            payload['retry'] = int(config['Validated']['retry'])
-            payload['expire'] = int(config['Validated']['expire'])
+            payload['retry'] = settings.retry
+            payload['expire'] = settings.expire
 
-        logger.debug(f"Attempting to send Pushover notification: {title} - {message}")
-        response = requests.post("https://api.pushover.net/1/messages.json", data=payload)
+        logger.debug("Attempting to send Pushover notification: %s - %s", title, message)
+        response = http_session.post("https://api.pushover.net/1/messages.json", data=payload)
         response.raise_for_status()
         logger.info("Pushover notification sent successfully", extra={'status_code': response.status_code, 'response_text': response.text})
     except requests.exceptions.HTTPError as http_err:
-        logger.error(f"Pushover HTTP error occurred: {http_err}", exc_info=True)
+        logger.error("Pushover HTTP error occurred: %s", http_err, exc_info=True)
     except requests.exceptions.RequestException as req_err:
-        logger.error(f"Pushover request exception: {req_err}", exc_info=True)
+        logger.error("Pushover request exception: %s", req_err, exc_info=True)
     except Exception as e:
         logger.error("Failed to send Pushover notification", exc_info=True)
 
@@ -331,70 +356,66 @@ def send_pushover_notification(message, title="Notification", priority=0, sound=
 def cleanup_logs():
     task_list.append("Starting log cleanup.")
     logger.info("Starting log cleanup.", extra={'file_name': 'N/A', 'department': 'N/A'})
-    now = datetime.now().timestamp()
-    logs = []
+    now = time()
 
-    # Gather all logs and their ages
-    for filename in os.listdir(log_dir):
-        file_path = os.path.join(log_dir, filename)
-        if os.path.isfile(file_path) and filename.endswith('.log'):
-            file_age = now - os.path.getmtime(file_path)
-            logs.append((file_path, file_age))
-
-    # Sort logs by age (oldest first)
-    logs.sort(key=lambda x: x[1])
+    # Gather all logs and their ages; scandir supplies the type and stat data 
+    # without separate isfile/getmtime calls per file
+    with os.scandir(log_dir) as entries:
+        logs = [
+            (entry.path, now - entry.stat().st_mtime)
+            for entry in entries
+            if entry.name.endswith('.log') and entry.is_file(follow_symlinks=False)
+        ]
 
     # Get the current log file path to avoid deletion
     current_log_file = log_file_path
 
-    # Archive logs based on age
+    # Partition logs by age: anything past max_log_days is archived outright
+    max_age = max_log_days * 86400
+    too_old = [(fp, fa) for fp, fa in logs if fa > max_age and fp != current_log_file]
+    recent = [(fp, fa) for fp, fa in logs if fa <= max_age or fp == current_log_file]
+
+    # If the remaining logs still exceed max_logs, pick the oldest extras with a 
+    # partial heap selection instead of sorting the whole list
+    excess = []
+    if len(recent) > max_logs:
+        candidates = [(fp, fa) for fp, fa in recent if fp != current_log_file]
+        excess = heapq.nlargest(len(recent) - max_logs, candidates, key=itemgetter(1))
+
+    # Archive old and excess logs in a single pass
     archived_files_count = 0
-    for file_path, file_age in logs:
-        if file_path == current_log_file:
-            continue
-        if file_age > max_log_days * 86400:
-            # Move the file to an archive directory atomically
-            archive_dir = os.path.join(log_dir, 'archive')
-            os.makedirs(archive_dir, exist_ok=True)
+    archive_dir = os.path.join(log_dir, 'archive')
+    if too_old or excess:
+        os.makedirs(archive_dir, exist_ok=True)
+    for reason, selected in (("old", too_old), ("excess", excess)):
+        for file_path, _ in selected:
+            # Move the file to an archive directory atomically; os.replace never fails on an
+            # existing target (unlike os.rename on Windows), and a unique suffix keeps an
+            # earlier archive of the same name from being overwritten
             destination = os.path.join(archive_dir, os.path.basename(file_path))
+            if os.path.exists(destination):
+                destination = f"{destination}.{time_ns()}"
             try:
-                shutil.move(file_path, destination)
-                task_list.append(f"Archived old log file: {os.path.basename(file_path)}")
-                logger.info(f"Archived old log file: {os.path.basename(file_path)}")
+                os.replace(file_path, destination)
+                task_list.append(f"Archived {reason} log file: {os.path.basename(file_path)}")
+                logger.info("Archived %s log file: %s", reason, os.path.basename(file_path))
                 archived_files_count += 1
             except Exception as e:
                 error_message = f"Failed to archive log file {file_path}"
                 error_list.append(error_message)
                 logger.error(error_message, exc_info=True)
 
-    # Re-evaluate logs after age-based cleanup
-    logs = [(fp, fa) for fp, fa in logs if os.path.exists(fp)]
-
-    # If number of logs exceeds max_logs, archive the oldest ones
-    if len(logs) > max_logs:
-        logs_to_archive = len(logs) - max_logs
-        for i in range(logs_to_archive):
-            if logs[i][0] == current_log_file:
-                continue
-            archive_dir = os.path.join(log_dir, 'archive')
-            os.makedirs(archive_dir, exist_ok=True)
-            destination = os.path.join(archive_dir, os.path.basename(logs[i][0]))
-            try:
-                shutil.move(logs[i][0], destination)
-                task_list.append(f"Archived excess log file: {os.path.basename(logs[i][0])}")
-                logger.info(f"Archived excess log file: {os.path.basename(logs[i][0])}")
-                archived_files_count += 1
-            except Exception as e:
-                error_message = f"Failed to archive log file {logs[i][0]}"
-                error_list.append(error_message)
-                logger.error(error_message, exc_info=True)
-
     if archived_files_count == 0:
         task_list.append("No old or excess log files were found for archiving.")
         logger.info("No old or excess log files were found for archiving.")
     else:
         task_list.append(f"Archived {archived_files_count} old or excess log file(s).")
-        logger.info(f"Archived {archived_files_count} old or excess log file(s).")
+        logger.info("Archived %s old or excess log file(s).", archived_files_count)
+
+    try:
+        record_log_cleanup(log_dir)
+    except OSError:
+        logger.warning("Failed to update the log cleanup marker", exc_info=True)
 
     task_list.append("Log cleanup completed.")
     logger.info("Log cleanup completed.", extra={'file_name': 'N/A', 'department': 'N/A'})
@@ -418,10 +439,36 @@ class CriticalSystemError(Exception):
     """Raised for critical system failures that require immediate attention."""
     pass
 
+# -----------------------------------------------------------------------------
+# Validated Settings
+# -----------------------------------------------------------------------------
+@dataclass(frozen=True)
+class Settings:
+    """Typed, read-only view of the configuration checked by log_and_validate_config()."""
+    ftp_server: str
+    ftp_port: int
+    ftp_user: str
+    ftp_pass: str
+    base_path: str
+    pushover_token: str
+    pushover_user: str
+    priority: int
+    retry: int
+    expire: int
+    sound: str
+    webhook_url: str
+    base_audio_url: str
+    retry_delay: int
+    cooldown_period: int
+
+# Populated by log_and_validate_config(); None until validation succeeds
+settings = None
+
 # -----------------------------------------------------------------------------
 # Function: log_and_validate_config
 # -----------------------------------------------------------------------------
 def log_and_validate_config():
+    global settings
     try:
         logger.info("Starting configuration validation...")
 
@@ -435,7 +482,7 @@ def log_and_validate_config():
         cooldown_period = config['ttd_audio_notification_Pushover'].getint('cooldown_period', fallback=300)
 
         # Log non-sensitive Pushover settings
-        logger.debug(f"Pushover User: {pushover_user}")
+        logger.debug("Pushover User: %s", pushover_user)
 
         # Validate Pushover settings
         if not pushover_token or not pushover_user:
@@ -468,7 +515,7 @@ def log_and_validate_config():
         ftp_pass = os.getenv('FTP_PASS') or config['ttd_audio_notification_ftp']['ftp_pass']
 
         # Log non-sensitive FTP settings
-        logger.debug(f"FTP Server: {ftp_server}, FTP Port: {ftp_port}, FTP User: {ftp_user}")
+        logger.debug("FTP Server: %s, FTP Port: %s, FTP User: %s", ftp_server, ftp_port, ftp_user)
 
         # Validate FTP settings
         if not ftp_server or not ftp_port or not ftp_user or not ftp_pass:
@@ -479,7 +526,7 @@ def log_and_validate_config():
 
         # Base path for audio files
         base_path = config['ttd_audio_notification_Path']['base_path']
-        logger.debug(f"Base Path: {base_path}")
+        logger.debug("Base Path: %s", base_path)
 
         if not base_path or not os.path.isdir(base_path):
             raise ValueError("Base path for audio files is missing or invalid in config.ini")
@@ -492,24 +539,24 @@ def log_and_validate_config():
         else:
             raise ValueError("Base audio URL is missing in config.ini")
 
-        # Store validated values in 'Validated' section
-        config['Validated'] = {
-            'ftp_server': ftp_server,
-            'ftp_port': ftp_port,
-            'ftp_user': ftp_user,
-            'ftp_pass': ftp_pass,
-            'base_path': base_path,
-            'pushover_token': pushover_token,
-            'pushover_user': pushover_user,
-            'priority': str(priority),
-            'retry': str(retry),
-            'expire': str(expire),
-            'sound': sound,
-            'webhook_url': webhook_url,
-            'base_audio_url': base_audio_url,
-            'retry_delay': str(retry_delay),
-            'cooldown_period': str(cooldown_period)
-        }
+        # Store the validated, typed values
+        settings = Settings(
+            ftp_server=ftp_server,
+            ftp_port=int(ftp_port),
+            ftp_user=ftp_user,
+            ftp_pass=ftp_pass,
+            base_path=base_path,
+            pushover_token=pushover_token,
+            pushover_user=pushover_user,
+            priority=priority,
+            retry=retry,
+            expire=expire,
+            sound=sound,
+            webhook_url=webhook_url,
+            base_audio_url=base_audio_url,
+            retry_delay=retry_delay,
+            cooldown_period=cooldown_period
+        )
 
         logger.debug("Configuration validation completed successfully.")
         logger.debug("Validated Configuration: ftp_server, ftp_port, ftp_user, ftp_pass, base_path, pushover_token, pushover_user, priority, retry, expire, sound, webhook_url, base_audio_url, retry_delay, cooldown_period")
@@ -534,9 +581,9 @@ def connect_to_ftp():
     try:
         logger.debug("Connecting to FTP server")
         ftp = FTP()
-        ftp.connect(config['Validated']['ftp_server'], int(config['Validated']['ftp_port']), timeout=30)
-        ftp.login(config['Validated']['ftp_user'], config['Validated']['ftp_pass'])
-        logger.info("Connected to FTP server", extra={'ftp_server': config['Validated']['ftp_server']})
+        ftp.connect(settings.ftp_server, settings.ftp_port, timeout=30)
+        ftp.login(settings.ftp_user, settings.ftp_pass)
+        logger.info("Connected to FTP server", extra={'ftp_server': settings.ftp_server})
         return ftp
     except (error_reply, error_temp, error_perm, error_proto) as ftp_exc:
         logger.error("FTP connection error", exc_info=True)
@@ -549,7 +596,7 @@ def connect_to_ftp_with_retries(max_retries=3, backoff_factor=2):
             return connect_to_ftp()
         except FTPConnectionError as e:
             wait_time = backoff_factor ** attempt
-            logger.warning(f"FTP connection attempt {attempt + 1} failed. Retrying in {wait_time} seconds...")
+            logger.warning("FTP connection attempt %s failed. Retrying in %s seconds...", attempt + 1, wait_time)
             sleep(wait_time)
             attempt += 1
     # After all retries have failed, send immediate critical notification
@@ -709,7 +756,7 @@ def send_webhook(file_name, topic, retries=3):
             raise KeyError("Webhook configuration missing")
 
         file_name = os.path.basename(file_name)
-        base_audio_url = config['Validated']['base_audio_url']
+        base_audio_url = settings.base_audio_url
         file_url = f"{base_audio_url}{file_name}"
 
         payload = {
@@ -721,27 +768,35 @@ def send_webhook(file_name, topic, retries=3):
         }
 
         attempt = 0
-        retry_delay = int(config['Validated']['retry_delay'])
+        retry_delay = settings.retry_delay
         timeout_seconds = int(config['ttd_audio_notification_Webhook']['timeout_seconds'])
 
         while attempt < retries:
             try:
                 logger.debug("Sending webhook", extra={'attempt': attempt + 1, 'payload': payload})
-                response = requests.post(config['Validated']['webhook_url'], json=payload, timeout=timeout_seconds)
+                response = http_session.post(settings.webhook_url, json=payload, timeout=timeout_seconds)
                 response.raise_for_status()
                 logger.info("Webhook sent successfully", extra={'status_code': response.status_code, 'response_text': response.text, 'payload': payload})
                 return True
             except requests.exceptions.RequestException as e:
                 logger.warning("Webhook attempt failed", exc_info=True, extra={'attempt': attempt + 1})
                 attempt += 1
+                status_code = e.response.status_code if e.response is not None else None
+                if status_code is not None and 400 <= status_code < 500 and status_code != 429:
+                    # Client errors (other than rate limiting) will not succeed on retry
+                    logger.error("Webhook rejected by server; not retrying", extra={'status_code': status_code})
+                    break
                 if attempt < retries:
                     backoff_time = retry_delay * math.pow(2, attempt - 1)  # Exponential backoff
-                    logger.info(f"Retrying webhook in {backoff_time} seconds", extra={'retry_delay': backoff_time})
+                    retry_after = e.response.headers.get('Retry-After', '') if status_code == 429 else ''
+                    if retry_after.isdigit():
+                        backoff_time = int(retry_after)  # Honor the server's rate-limit hint
+                    logger.info("Retrying webhook in %s seconds", backoff_time, extra={'retry_delay': backoff_time})
                     sleep(backoff_time)
 
         # After all retries have failed
         message = (
-            f"WebhookError at {get_current_timestamp()}: Failed after {retries} attempts.\n"
+            f"WebhookError at {get_current_timestamp()}: Failed after {attempt} attempts.\n"
             "Possible causes: Node-RED server down, network issues.\n"
             "Action: Check Node-RED server status and verify the webhook URL."
         )
@@ -753,7 +808,7 @@ def send_webhook(file_name, topic, retries=3):
             sound='tugboat',
             error_type=ErrorType.WebhookError
         )
-        raise WebhookError(f"Webhook failed after {retries} attempts.")
+        raise WebhookError(f"Webhook failed after {attempt} attempts.")
 
     except Exception as e:
         logger.error("Webhook error occurred", exc_info=True)
@@ -778,10 +833,14 @@ def performance_monitor(stop_event):
     cpu_threshold = config['ttd_audio_notification_Performance'].getint('cpu_threshold')
     interval = config['ttd_audio_notification_Performance'].getint('monitor_interval')  # in seconds
 
+    # Prime the CPU counter; each later reading is the average since the previous one,
+    # covering the whole monitor interval without blocking for a separate sample
+    psutil.cpu_percent(interval=None)
+
     while not stop_event.is_set():
         try:
             memory_usage = psutil.virtual_memory().percent
-            cpu_usage = psutil.cpu_percent(interval=1)
+            cpu_usage = psutil.cpu_percent(interval=None)
             task_list.append(f"Performance metrics - Memory Usage: {memory_usage}%, CPU Usage: {cpu_usage}%")
             logger.info("Performance metrics", extra={'memory_usage': memory_usage, 'cpu_usage': cpu_usage})
 
@@ -828,7 +887,7 @@ def parse_arguments():
 # Graceful Shutdown Handler
 # -----------------------------------------------------------------------------
 def shutdown_handler(signum, frame):
-    logger.info(f"Received shutdown signal ({signum}). Shutting down gracefully...")
+    logger.info("Received shutdown signal (%s). Shutting down gracefully...", signum)
     global stop_event
     stop_event.set()
 
@@ -898,7 +957,7 @@ def send_grouped_notifications():
 def main():
     global stop_event
     logger.debug("Starting script execution")
-    start_time = time()
+    start_time = perf_counter()
 
     # Initialize stop_event for graceful shutdown
     stop_event = Event()
@@ -913,7 +972,7 @@ def main():
         log_and_validate_config()
 
         args = parse_arguments()
-        mp3_file = os.path.join(config['Validated']['base_path'], args.audio_file)
+        mp3_file = os.path.join(settings.base_path, args.audio_file)
         department = args.department
 
         if not os.path.isfile(mp3_file):
@@ -967,11 +1026,12 @@ def main():
         )
         sys.exit(1)
     finally:
-        # Perform log cleanup before sending notifications
-        cleanup_logs()
+        # Perform log cleanup (at most once a day) before sending notifications
+        if log_cleanup_due(log_dir):
+            cleanup_logs()
         # Send grouped notifications for tasks and non-critical errors
         send_grouped_notifications()
-        execution_time = time() - start_time
+        execution_time = perf_counter() - start_time
         logger.info("Script completed", extra={'execution_time': execution_time})
         logger.debug("Exiting script")
         if stop_event and not stop_event.is_set():
@@ -80,8 +80,7 @@ pushover_expire = config.getint('BackupScript_Pushover', 'expire', fallback=3600
 pushover_sound = config.get('BackupScript_Pushover', 'sound', fallback='pushover')
 
 # Set up logging with a new file for each run in a subdirectory
-if not os.path.exists(log_directory):
-    os.makedirs(log_directory)
+os.makedirs(log_directory, exist_ok=True)
 
 current_time = datetime.now().strftime('%m-%d-%Y_%H-%M-%S')
 log_file = os.path.join(log_directory, f'ftp_upload_{current_time}.log')
@@ -121,11 +120,11 @@ def send_pushover_notification(message, title="TTD Backup Script", priority=push
         response.raise_for_status()
         logging.info("Pushover notification sent successfully.")
     except requests.exceptions.RequestException as e:
-        logging.error(f"Failed to send Pushover notification: {e}")
+        logging.error("Failed to send Pushover notification: %s", e)
 
 def calculate_md5(file_path):
     """Calculate the MD5 hash of a file for integrity verification."""
-    logging.info(f"Calculating MD5 hash for {file_path}")
+    logging.info("Calculating MD5 hash for %s", file_path)
     hash_md5 = hashlib.md5()
     try:
         with open(file_path, "rb") as f:
@@ -133,7 +132,7 @@ def calculate_md5(file_path):
                 hash_md5.update(chunk)
         return hash_md5.hexdigest()
     except Exception as e:
-        logging.error(f"Failed to calculate MD5 hash: {e}")
+        logging.error("Failed to calculate MD5 hash: %s", e)
         send_pushover_notification(f"Failed to calculate MD5 hash: {e}", priority=1)
         raise
 
@@ -143,10 +142,10 @@ def connect_to_ftp():
         ftp = FTP()
         ftp.connect(ftp_server, ftp_port)
         ftp.login(ftp_user, ftp_pass)
-        logging.info(f"Connected to FTP server {ftp_server}:{ftp_port}")
+        logging.info("Connected to FTP server %s:%s", ftp_server, ftp_port)
         return ftp
     except Exception as e:
-        logging.error(f"Failed to connect to FTP server: {e}")
+        logging.error("Failed to connect to FTP server: %s", e)
         send_pushover_notification(f"FTP connection failed: {e}", priority=1)
         return None
 
@@ -154,23 +153,23 @@ def delete_audio_files(source_dir):
     """Delete all audio files in the audio subdirectory."""
     audio_dir = os.path.join(source_dir, 'audio')
     if os.path.exists(audio_dir):
-        logging.info(f"Deleting audio files in {audio_dir}...")
+        logging.info("Deleting audio files in %s...", audio_dir)
         for root, _, files in os.walk(audio_dir):
             for file in files:
                 file_path = os.path.join(root, file)
                 os.remove(file_path)
-                logging.info(f"Deleted audio file: {file_path}")
+                logging.info("Deleted audio file: %s", file_path)
     else:
-        logging.info(f"No audio directory found at {audio_dir} to delete.")
+        logging.info("No audio directory found at %s to delete.", audio_dir)
 
 def compress_directory_to_zip(source_dir, output_zip):
     """Compress the source directory into a ZIP file."""
-    logging.info(f"Compressing directory {source_dir} into {output_zip}")
+    logging.info("Compressing directory %s into %s", source_dir, output_zip)
     try:
         shutil.make_archive(output_zip.replace('.zip', ''), 'zip', source_dir)
-        logging.info(f"Directory {source_dir} compressed into {output_zip}")
+        logging.info("Directory %s compressed into %s", source_dir, output_zip)
     except Exception as e:
-        logging.error(f"Failed to compress directory: {e}")
+        logging.error("Failed to compress directory: %s", e)
         send_pushover_notification(f"Compression failed: {e}", priority=1)
         raise
 
@@ -179,9 +178,9 @@ def download_file_from_ftp(ftp, remote_file, local_file):
     try:
         with open(local_file, 'wb') as f:
             ftp.retrbinary(f'RETR {remote_file}', f.write)
-        logging.info(f"Downloaded {remote_file} from FTP server to {local_file}")
+        logging.info("Downloaded %s from FTP server to %s", remote_file, local_file)
     except Exception as e:
-        logging.error(f"Failed to download {remote_file} from FTP server: {e}")
+        logging.error("Failed to download %s from FTP server: %s", remote_file, e)
         send_pushover_notification(f"Download failed: {e}", priority=1)
         raise
 
@@ -194,7 +193,7 @@ def upload_file_to_ftp(ftp, local_file, remote_file, retries=1):
 
             with open(local_file, 'rb') as f:
                 ftp.storbinary(f'STOR {remote_file}', f)
-            logging.info(f"Uploaded {local_file} to FTP server as {remote_file}")
+            logging.info("Uploaded %s to FTP server as %s", local_file, remote_file)
 
             # Download the file back from the FTP server to verify its integrity
             downloaded_file = f"{os.path.splitext(local_file)[0]}_downloaded.zip"
@@ -204,26 +203,26 @@ def upload_file_to_ftp(ftp, local_file, remote_file, retries=1):
             remote_md5 = calculate_md5(downloaded_file)
 
             if local_md5 == remote_md5:
-                logging.info(f"MD5 hash verified for {remote_file}")
+                logging.info("MD5 hash verified for %s", remote_file)
                 os.remove(downloaded_file)
-                logging.info(f"Temporary file {downloaded_file} deleted after verification.")
+                logging.info("Temporary file %s deleted after verification.", downloaded_file)
                 return True
             else:
-                logging.error(f"MD5 hash mismatch for {remote_file}")
+                logging.error("MD5 hash mismatch for %s", remote_file)
                 os.remove(downloaded_file)
                 attempt += 1
                 if attempt <= retries:
-                    logging.warning(f"Retrying upload and verification for {local_file} (Attempt {attempt})")
+                    logging.warning("Retrying upload and verification for %s (Attempt %s)", local_file, attempt)
                 else:
                     break
 
         except Exception as e:
-            logging.error(f"Failed to upload {local_file} to FTP server: {e}")
+            logging.error("Failed to upload %s to FTP server: %s", local_file, e)
             attempt += 1
             if attempt > retries:
                 break
 
-    logging.critical(f"Failed to upload and verify {local_file} after {retries + 1} attempts.")
+    logging.critical("Failed to upload and verify %s after %s attempts.", local_file, retries + 1)
     send_pushover_notification(f"Critical error: MD5 mismatch for {remote_file} after {retries + 1} attempts", priority=1)
     return False
 
@@ -239,12 +238,12 @@ def manage_backup_retention(ftp, ftp_root):
         # Check backup count and delete older backups if necessary
         while len(backups) > backup_retention_count:
             old_backup = backups.pop()
-            logging.info(f"Deleting old backup: {old_backup}")
+            logging.info("Deleting old backup: %s", old_backup)
             try:
                 ftp.delete(old_backup)
-                logging.info(f"Deleted backup: {old_backup}")
+                logging.info("Deleted backup: %s", old_backup)
             except error_perm as e:
-                logging.error(f"Failed to delete backup {old_backup}: {e}")
+                logging.error("Failed to delete backup %s: %s", old_backup, e)
 
         # Check backup age and delete backups older than the retention period
         current_time = datetime.now()
@@ -253,29 +252,27 @@ def manage_backup_retention(ftp, ftp_root):
             modified_time = datetime.strptime(modified_time, '%Y%m%d%H%M%S')
 
             if current_time - modified_time > timedelta(days=backup_retention_days):
-                logging.info(f"Deleting backup older than {backup_retention_days} days: {backup}")
+                logging.info("Deleting backup older than %s days: %s", backup_retention_days, backup)
                 try:
                     ftp.delete(backup)
-                    logging.info(f"Deleted backup: {backup}")
+                    logging.info("Deleted backup: %s", backup)
                 except error_perm as e:
-                    logging.error(f"Failed to delete backup {backup}: {e}")
+                    logging.error("Failed to delete backup %s: %s", backup, e)
 
     except Exception as e:
-        logging.error(f"Failed to manage backup retention: {e}")
+        logging.error("Failed to manage backup retention: %s", e)
         send_pushover_notification(f"Backup retention failed: {e}", priority=1)
 
 def manage_log_retention(log_dir, max_logs, max_days):
     """Delete logs based on the maximum number of logs and maximum log file age."""
-    logs = sorted(os.listdir(log_dir))
-    current_time = datetime.now()
+    cutoff = time.time() - max_days * 86400
 
     # Delete logs based on age
-    for log in logs:
-        log_path = os.path.join(log_dir, log)
-        log_time = datetime.fromtimestamp(os.path.getmtime(log_path))
-        if current_time - log_time > timedelta(days=max_days):
-            os.remove(log_path)
-            logging.info(f"Deleted old log file based on age: {log}")
+    with os.scandir(log_dir) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                logging.info("Deleted old log file based on age: %s", entry.name)
 
     # Re-sort logs after deleting old ones
     logs = sorted(os.listdir(log_dir))
@@ -284,12 +281,12 @@ def manage_log_retention(log_dir, max_logs, max_days):
     while len(logs) > max_logs:
         oldest_log = logs.pop(0)
         os.remove(os.path.join(log_dir, oldest_log))
-        logging.info(f"Deleted old log file based on count: {oldest_log}")
+        logging.info("Deleted old log file based on count: %s", oldest_log)
 
 def perform_backup_verification(ftp, remote_file, local_temp_dir):
     """Verify the integrity of the backup file stored on the FTP server by comparing MD5 hashes."""
     try:
-        logging.info(f"Verifying integrity of the backup file {remote_file} on FTP server.")
+        logging.info("Verifying integrity of the backup file %s on FTP server.", remote_file)
         
         # Download the backup file from the FTP server
         temp_download_path = os.path.join(local_temp_dir, f"{remote_file}_verification")
@@ -300,17 +297,17 @@ def perform_backup_verification(ftp, remote_file, local_temp_dir):
         remote_md5 = calculate_md5(os.path.join(local_temp_dir, remote_file))
         
         if local_md5 == remote_md5:
-            logging.info(f"MD5 hash verification successful for {remote_file}.")
+            logging.info("MD5 hash verification successful for %s.", remote_file)
         else:
-            logging.error(f"MD5 hash verification failed for {remote_file}.")
+            logging.error("MD5 hash verification failed for %s.", remote_file)
             raise ValueError("MD5 hash mismatch during backup verification.")
         
         # Clean up the temporary verification file
         os.remove(temp_download_path)
-        logging.info(f"Temporary verification file {temp_download_path} deleted after verification.")
+        logging.info("Temporary verification file %s deleted after verification.", temp_download_path)
     
     except Exception as e:
-        logging.critical(f"Failed to verify backup integrity: {e}", exc_info=True)
+        logging.critical("Failed to verify backup integrity: %s", e, exc_info=True)
         send_pushover_notification(f"Backup verification failed for {remote_file}: {e}", priority=1)
 
 def graceful_shutdown(signum, frame):
@@ -326,7 +323,7 @@ def main():
     """Main function to handle directory compression, file upload, integrity check, and retention management."""
     zip_file_path = os.path.join(temp_directory, 'TTD_Backup_' + datetime.now().strftime('%m-%d-%Y_%H-%M-%S') + '.zip')
     
-    start_time = datetime.now()
+    start_time = time.perf_counter()
     
     try:
         # Delete audio files before compression
@@ -353,25 +350,24 @@ def main():
         try:
             ftp.quit()
         except Exception as e:
-            logging.error(f"Failed to properly close the FTP connection: {e}")
+            logging.error("Failed to properly close the FTP connection: %s", e)
 
         # Manage log retention after processing
         manage_log_retention(log_directory, max_logs, max_log_days)
 
     except Exception as e:
-        logging.critical(f"Unexpected critical error: {e}", exc_info=True)
+        logging.critical("Unexpected critical error: %s", e, exc_info=True)
         send_pushover_notification(f"Critical error: {e}", priority=1)
 
     finally:
         # Clean up the local ZIP file after upload
         if os.path.exists(zip_file_path):
             os.remove(zip_file_path)
-            logging.info(f"Temporary file {zip_file_path} deleted.")
+            logging.info("Temporary file %s deleted.", zip_file_path)
         
         # Log the script execution time
-        end_time = datetime.now()
-        execution_time = end_time - start_time
-        logging.info(f"Script completed in {execution_time} seconds.")
+        execution_time = time.perf_counter() - start_time
+        logging.info("Script completed in %.2f seconds.", execution_time)
 
         # Send final pushover notification on completion
         send_pushover_notification("Backup script completed successfully.")
@@ -2,14 +2,18 @@ import os
 import time
 import logging
 from logging.handlers import RotatingFileHandler
-from datetime import datetime
 import subprocess
 import requests
 import configparser
+from dataclasses import dataclass
 import signal
+import select
+import socket
 import sys
 from dotenv import load_dotenv
 
+from ttd_logging import make_logger, get_formatter, parse_level, log_cleanup_due, record_log_cleanup
+
 # -----------------------------------------------------------------------------
 # Script Information
 # -----------------------------------------------------------------------------
@@ -61,109 +65,149 @@ config = configparser.ConfigParser(interpolation=None)
 config.read(config_path)
 
 # -----------------------------------------------------------------------------
-# Logging Configuration
-# -----------------------------------------------------------------------------
-# Access Logging configuration with fallback defaults in case config.ini is incomplete
-log_dir = os.path.join(script_dir, config['ttd_heartbeat_Logging'].get('log_dir', '/default/log/dir'))
-log_level = config['ttd_heartbeat_Logging'].get('log_level', 'INFO')
-log_format = config['ttd_heartbeat_Logging'].get('log_format', '%(asctime)s - %(levelname)s - %(message)s')
-log_to_console = config.getboolean('ttd_heartbeat_Logging', 'log_to_console', fallback=True)
-max_log_days = config['ttd_heartbeat_Logging'].getint('max_log_days', 7)
-
-# Ensure the log directory exists
-if not os.path.exists(log_dir):
-    os.makedirs(log_dir)
-
-# Configure logging with fallback defaults for logging directory and format
-log_file_name = f"heartbeat_monitor_{datetime.now().strftime('%m-%d-%Y_%H-%M-%S')}.log"
-log_file_path = os.path.join(log_dir, log_file_name)
-
-logging.basicConfig(
-    filename=log_file_path,
-    level=getattr(logging, log_level.upper(), logging.DEBUG),
-    format=log_format
-)
-
-
-# Optionally log to console if enabled in config
-if log_to_console:
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(getattr(logging, log_level.upper(), logging.DEBUG))
-    console_handler.setFormatter(logging.Formatter(log_format))
-    logging.getLogger().addHandler(console_handler)
+# Settings
+# -----------------------------------------------------------------------------
+@dataclass(frozen=True)
+class Settings:
+    """Read-only view of the config.ini and .env values used by the monitor."""
+    # Logging
+    log_dir: str
+    log_level: int
+    log_format: str
+    log_to_console: bool
+    max_log_days: int
+    # Heartbeat monitoring
+    heartbeat_file: str
+    check_interval: int
+    heartbeat_threshold: int
+    external_script: str
+    # Pushover
+    pushover_token: str
+    pushover_user: str
+    pushover_priority: int
+    pushover_retry: int
+    pushover_expire: int
+    pushover_sound: str
+    # Webhook
+    webhook_url: str
+    # Feature toggles
+    enable_restart_notifications: bool
+    enable_rate_limiting: bool
+    # Audit logging
+    audit_log_dir: str
+    audit_log_level: int
+    # Shutdown
+    shutdown_message: str
+    perform_cleanup: bool
+
+def load_settings(config):
+    """
+    Reads every setting the monitor needs from config.ini and the environment.
 
-# Add a RotatingFileHandler for the standard log file
-rotating_handler = RotatingFileHandler(log_file_path, maxBytes=1048576, backupCount=5)  # 1 MB file size limit
-rotating_handler.setFormatter(logging.Formatter(log_format))  # Use the same format as basicConfig
-logging.getLogger().addHandler(rotating_handler)
+    Missing values fall back to defaults so an incomplete config.ini still
+    produces a usable configuration. Parsing happens once at startup; the rest
+    of the script only reads attributes of the returned object.
 
+    Args:
+        config (configparser.ConfigParser): The parsed config.ini.
 
-logging.info("Logging initialized.")
-logging.info(f"Logs will be stored in: {log_dir}")
-logging.info(f"Log file: {log_file_name}")
+    Returns:
+        Settings: The settings for this run.
+    """
+    check_interval = config['Heartbeat'].getint('check_interval', 60)  # Default check every 60 seconds
+    heartbeat_threshold = config['Heartbeat'].getint('threshold', int(check_interval * 1.5))  # Default threshold
+
+    # Minimum threshold safeguard to prevent overly sensitive alerts
+    min_threshold = 60
+
+    return Settings(
+        log_dir=os.path.join(script_dir, config['ttd_heartbeat_Logging'].get('log_dir', '/default/log/dir')),
+        log_level=parse_level(config['ttd_heartbeat_Logging'].get('log_level', 'INFO')),
+        log_format=config['ttd_heartbeat_Logging'].get('log_format', '%(asctime)s - %(levelname)s - %(message)s'),
+        log_to_console=config.getboolean('ttd_heartbeat_Logging', 'log_to_console', fallback=True),
+        max_log_days=config['ttd_heartbeat_Logging'].getint('max_log_days', 7),
+        heartbeat_file=config['Heartbeat'].get('file_path', '/default/heartbeat/path'),
+        check_interval=check_interval,
+        heartbeat_threshold=max(heartbeat_threshold, min_threshold),
+        external_script=config['Restart_Path'].get('file_path', '/default/start/script/path'),
+        # Credentials come from environment variables
+        pushover_token=os.getenv('PUSHOVER_TOKEN', 'default_token'),
+        pushover_user=os.getenv('PUSHOVER_USER', 'default_user'),
+        pushover_priority=config['ttd_heartbeat_Pushover'].getint('priority', 1),
+        pushover_retry=config['ttd_heartbeat_Pushover'].getint('retry', 60),
+        pushover_expire=config['ttd_heartbeat_Pushover'].getint('expire', 3600),
+        pushover_sound=config['ttd_heartbeat_Pushover'].get('sound', 'pushover'),
+        webhook_url=config['Webhook'].get('heartbeat_url', 'http://default_webhook_url'),
+        enable_restart_notifications=config.getboolean('ttd_heartbeat_Features', 'enable_restart_notifications', fallback=True),
+        enable_rate_limiting=config.getboolean('ttd_heartbeat_Features', 'enable_rate_limiting', fallback=True),
+        audit_log_dir=os.path.join(script_dir, config['ttd_heartbeat_AuditLogging'].get('audit_log_dir', '/default/audit/dir')),
+        audit_log_level=parse_level(config['ttd_heartbeat_AuditLogging'].get('audit_log_level', 'INFO')),
+        shutdown_message=config['ttd_heartbeat_Shutdown'].get('shutdown_message', 'Heartbeat Monitor shutting down...'),
+        perform_cleanup=config.getboolean('ttd_heartbeat_Shutdown', 'perform_cleanup', fallback=True)
+    )
+
+settings = load_settings(config)
 
 # -----------------------------------------------------------------------------
-# Heartbeat Monitoring Configuration
+# Logging Configuration
 # -----------------------------------------------------------------------------
-# Access Heartbeat monitoring configuration with fallback defaults
-heartbeat_file = config['Heartbeat'].get('file_path', '/default/heartbeat/path')
-check_interval = config['Heartbeat'].getint('check_interval', 60)  # Default check every 60 seconds
-heartbeat_threshold = config['Heartbeat'].getint('threshold', int(check_interval * 1.5))  # Default threshold
+# Configure logging with fallback defaults for logging directory and format
+log_file_name = f"heartbeat_monitor_{time.strftime('%m-%d-%Y_%H-%M-%S')}.log"
+log_file_path = os.path.join(settings.log_dir, log_file_name)
+root_logger = make_logger(
+    None, log_file_path, 1048576, 5,  # 1 MB file size limit
+    settings.log_to_console, level=settings.log_level, log_format=settings.log_format
+)
 
-# Minimum threshold safeguard to prevent overly sensitive alerts
-min_threshold = 60
-heartbeat_threshold = max(heartbeat_threshold, min_threshold)
+logging.info("Logging initialized.")
+logging.info("Logs will be stored in: %s", settings.log_dir)
+logging.info("Log file: %s", log_file_name)
 
-# External script to start the monitored program, with fallback default
-external_script = config['Restart_Path'].get('file_path', '/default/start/script/path')
+# Output of the external script is appended here
+external_script_log_path = os.path.join(settings.log_dir, 'external_script.log')
 
 # -----------------------------------------------------------------------------
 # Pushover Configuration
 # -----------------------------------------------------------------------------
-# Access Pushover credentials and settings from environment variables or fallback defaults
-pushover_token = os.getenv('PUSHOVER_TOKEN', 'default_token')
-pushover_user = os.getenv('PUSHOVER_USER', 'default_user')
-pushover_priority = config['ttd_heartbeat_Pushover'].getint('priority', 1)
-pushover_retry = config['ttd_heartbeat_Pushover'].getint('retry', 60)
-pushover_expire = config['ttd_heartbeat_Pushover'].getint('expire', 3600)
-pushover_sound = config['ttd_heartbeat_Pushover'].get('sound', 'pushover')
-
-# -----------------------------------------------------------------------------
-# Webhook Configuration
-# -----------------------------------------------------------------------------
-# Access Webhook configuration with fallback default URL
-webhook_url = config['Webhook'].get('heartbeat_url', 'http://default_webhook_url')
-
-# -----------------------------------------------------------------------------
-# Feature Toggles
-# -----------------------------------------------------------------------------
-# Access feature toggles with fallback defaults
-enable_restart_notifications = config.getboolean('ttd_heartbeat_Features', 'enable_restart_notifications', fallback=True)
-enable_rate_limiting = config.getboolean('ttd_heartbeat_Features', 'enable_rate_limiting', fallback=True)
+# Static part of every Pushover request; only the message changes per alert
+pushover_base_payload = {
+    "token": settings.pushover_token,
+    "user": settings.pushover_user,
+    "title": "Heartbeat Monitor Alert",
+    "priority": settings.pushover_priority,
+    "retry": settings.pushover_retry,
+    "expire": settings.pushover_expire,
+    "sound": settings.pushover_sound
+}
 
 # -----------------------------------------------------------------------------
 # Audit Logging Configuration
 # -----------------------------------------------------------------------------
-# Audit log configuration with fallback defaults
-audit_log_dir = os.path.join(script_dir, config['ttd_heartbeat_AuditLogging'].get('audit_log_dir', '/default/audit/dir'))
-audit_log_level = config['ttd_heartbeat_AuditLogging'].get('audit_log_level', 'INFO')
-
 # Ensure the audit log directory exists
-if not os.path.exists(audit_log_dir):
-    os.makedirs(audit_log_dir)
+os.makedirs(settings.audit_log_dir, exist_ok=True)
 
 # Configure audit logging
-audit_log_file_name = f"audit_{datetime.now().strftime('%m-%d-%Y_%H-%M-%S')}.log"
-audit_log_file_path = os.path.join(audit_log_dir, audit_log_file_name)
+audit_log_file_name = f"audit_{time.strftime('%m-%d-%Y_%H-%M-%S')}.log"
+audit_log_file_path = os.path.join(settings.audit_log_dir, audit_log_file_name)
+
+# Audit records share the root logger and are routed to the audit file by a filter,
+# so each event is formatted and dispatched once. Pass extra=AUDIT to also audit a record.
+AUDIT = {'audit': True}
 
-audit_logger = logging.getLogger('audit')
-audit_logger.setLevel(getattr(logging, audit_log_level.upper(), logging.INFO))
 audit_handler = RotatingFileHandler(audit_log_file_path, maxBytes=1048576, backupCount=5)
-audit_handler.setFormatter(logging.Formatter(log_format))
-audit_logger.addHandler(audit_handler)
+audit_handler.setLevel(settings.audit_log_level)
+audit_handler.setFormatter(get_formatter(settings.log_format))  # Same instance as the standard handlers
+audit_handler.addFilter(lambda record: getattr(record, 'audit', False))
+
+# The root logger's level gates every record before any handler sees it, so it 
+# must admit both thresholds; log_level then moves to the standard handlers
+for handler in root_logger.handlers:
+    handler.setLevel(settings.log_level)
+root_logger.setLevel(min(settings.log_level, settings.audit_log_level))
+root_logger.addHandler(audit_handler)
 
 logging.info("Audit logging initialized.")
-audit_logger.info(f"Audit log file: {audit_log_file_name}")
+logging.info("Audit log file: %s", audit_log_file_name, extra=AUDIT)
 
 # -----------------------------------------------------------------------------
 # Function: send_pushover_notification
@@ -182,24 +226,13 @@ def send_pushover_notification(message, additional_info=None):
     """
     pushover_url = "https://api.pushover.net/1/messages.json"
     full_message = f"{message}\nDetails: {additional_info}" if additional_info else message
-    payload = {
-        "token": pushover_token,
-        "user": pushover_user,
-        "message": full_message,
-        "title": "Heartbeat Monitor Alert",
-        "priority": pushover_priority,
-        "retry": pushover_retry,
-        "expire": pushover_expire,
-        "sound": pushover_sound
-    }
+    payload = {**pushover_base_payload, "message": full_message}
     try:
-        response = requests.post(pushover_url, data=payload)
+        response = requests.post(pushover_url, data=payload, timeout=(3, 10))  # (connect, read) seconds
         response.raise_for_status()
-        logging.info("Pushover notification sent successfully.")
-        audit_logger.info(f"Pushover notification sent: {full_message}")
+        logging.info("Pushover notification sent: %s", full_message, extra=AUDIT)
     except requests.exceptions.RequestException as e:
-        logging.error(f"Failed to send Pushover notification: {e}")
-        audit_logger.error(f"Failed to send Pushover notification: {e}")
+        logging.error("Failed to send Pushover notification: %s", e, extra=AUDIT)
 
 # -----------------------------------------------------------------------------
 # Function: check_heartbeat
@@ -211,9 +244,11 @@ def check_heartbeat():
     """
     Checks the heartbeat log file for updates.
 
-    This function reads the last update time from the heartbeat file and 
-    compares it with the current time. If the difference exceeds the 
-    'heartbeat_threshold', it logs a warning and returns False.
+    The file's modification time is checked first: if the file was written
+    within 'heartbeat_threshold', the heartbeat is alive and the file is not
+    read. Otherwise the last update time recorded in the file is compared
+    with the current time; if the difference exceeds the threshold, it logs
+    a warning and returns False.
 
     Returns:
         bool: True if the heartbeat is within the threshold, False otherwise.
@@ -223,31 +258,31 @@ def check_heartbeat():
         ValueError: If the heartbeat file contains invalid data.
     """
     try:
-        with open(heartbeat_file, 'r') as file:
+        # Fast path: a recently written file means the heartbeat is alive, no need to read it
+        if time.time() - os.stat(settings.heartbeat_file).st_mtime <= settings.heartbeat_threshold:
+            logging.debug("Heartbeat detected.", extra=AUDIT)
+            return True
+
+        with open(settings.heartbeat_file, 'r') as file:
             last_heartbeat = int(float(file.read().strip()))  # Handle float conversion if needed
         current_time = int(time.time())
         time_diff = current_time - last_heartbeat
 
-        if time_diff > heartbeat_threshold:
-            logging.warning(f"No heartbeat detected. Last heartbeat was {time_diff} seconds ago.")
-            audit_logger.warning(f"No heartbeat detected. Last heartbeat was {time_diff} seconds ago.")
+        if time_diff > settings.heartbeat_threshold:
+            logging.warning("No heartbeat detected. Last heartbeat was %s seconds ago.", time_diff, extra=AUDIT)
             return False
         else:
-            logging.debug("Heartbeat detected.")
-            audit_logger.debug("Heartbeat detected.")
+            logging.debug("Heartbeat detected.", extra=AUDIT)
             return True
 
     except FileNotFoundError:
-        logging.error(f"Heartbeat file not found: {heartbeat_file}")
-        audit_logger.error(f"Heartbeat file not found: {heartbeat_file}")
+        logging.error("Heartbeat file not found: %s", settings.heartbeat_file, extra=AUDIT)
         return False
     except ValueError:
-        logging.error(f"Heartbeat file contains invalid data: {heartbeat_file}")
-        audit_logger.error(f"Heartbeat file contains invalid data: {heartbeat_file}")
+        logging.error("Heartbeat file contains invalid data: %s", settings.heartbeat_file, extra=AUDIT)
         return False
     except Exception as e:
-        logging.critical(f"Critical error checking heartbeat: {str(e)}", exc_info=True)
-        audit_logger.critical(f"Critical error checking heartbeat: {str(e)}", exc_info=True)
+        logging.critical("Critical error checking heartbeat: %s", e, exc_info=True, extra=AUDIT)
         return False
 
 # -----------------------------------------------------------------------------
@@ -273,33 +308,30 @@ def send_alert(message, relaunching=False, relaunch_success=False):
         None
     """
     global last_alert_time
-    current_time = time.time()
+    current_time = time.monotonic()  # Monotonic so wall-clock adjustments can't skew the cooldown
 
     # Check if rate limiting should be applied
-    apply_rate_limit = enable_rate_limiting and not relaunch_success
+    apply_rate_limit = settings.enable_rate_limiting and not relaunch_success
 
     if not apply_rate_limit or (last_alert_time is None or (current_time - last_alert_time) > 300):  # 5-minute cooldown
         last_alert_time = current_time
         # Add timestamp to the message
-        timestamp = datetime.now().strftime('%A %B %d, %Y %H:%M:%S')
+        timestamp = time.strftime('%A %B %d, %Y %H:%M:%S')
         full_message = f"{timestamp} - {message}"
 
         # Send webhook notification
         try:
             payload = {"message": full_message}
-            response = requests.post(webhook_url, json=payload)
+            response = requests.post(settings.webhook_url, json=payload, timeout=(3, 10))  # (connect, read) seconds
             response.raise_for_status()
-            logging.info("Alert sent successfully via webhook.")
-            audit_logger.info(f"Alert sent via webhook: {full_message}")
+            logging.info("Alert sent via webhook: %s", full_message, extra=AUDIT)
         except requests.exceptions.RequestException as e:
-            logging.error(f"Failed to send webhook alert: {str(e)}")
-            audit_logger.error(f"Failed to send webhook alert: {str(e)}")
+            logging.error("Failed to send webhook alert: %s", e, extra=AUDIT)
 
         # Send Pushover notification
         send_pushover_notification(full_message)
     else:
-        logging.info("Alert suppressed due to rate limiting.")
-        audit_logger.info("Alert suppressed due to rate limiting.")
+        logging.info("Alert suppressed due to rate limiting.", extra=AUDIT)
 
 # -----------------------------------------------------------------------------
 # Function: start_external_script
@@ -315,46 +347,39 @@ def start_external_script():
     retries = 3
     for attempt in range(retries):
         try:
-            # Execute the external Python script
-            command = f'python "{external_script}"'
-            logging.debug(f"Executing command: {command}")  # DEBUG level for more details
-            audit_logger.debug(f"Executing command: {command}")
-
-            process = subprocess.run(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-
-            # Log the results (including DEBUG level for stdout and stderr)
-            logging.debug(f"Return code: {process.returncode}")
-            logging.debug(f"Stdout: {process.stdout}")
-            audit_logger.debug(f"Return code: {process.returncode}")
-            audit_logger.debug(f"Stdout: {process.stdout}")
-            if process.stderr:
-                logging.error(f"Stderr: {process.stderr}")
-                audit_logger.error(f"Stderr: {process.stderr}")
+            # Execute the external Python script with the current interpreter; passing an
+            # argument list without a shell keeps the path from being re-parsed or expanded
+            command = [sys.executable, settings.external_script]
+            logging.debug("Executing command: %s", command, extra=AUDIT)  # DEBUG level for more details
+
+            # Stream the script's stdout/stderr straight into its own log file rather than
+            # buffering the whole output in memory
+            with open(external_script_log_path, 'ab') as external_script_log:
+                process = subprocess.run(command, shell=False, stdout=external_script_log, stderr=subprocess.STDOUT)
+
+            # Log the results (script output is in the external script log)
+            logging.debug("Return code: %s", process.returncode, extra=AUDIT)
+            logging.debug("Script output appended to: %s", external_script_log_path, extra=AUDIT)
 
             if process.returncode == 0:
-                logging.info(f"Successfully executed the script: {external_script}")
-                audit_logger.info(f"Successfully executed the script: {external_script}")
-                if enable_restart_notifications:
+                logging.info("Successfully executed the script: %s", settings.external_script, extra=AUDIT)
+                if settings.enable_restart_notifications:
                     send_alert("Program successfully restarted.", relaunch_success=True)
                 break  # Exit loop on success
             else:
-                logging.error(f"Failed to execute the script: {external_script}")
-                audit_logger.error(f"Failed to execute the script: {external_script}")
-                if enable_restart_notifications:
+                logging.error("Failed to execute the script: %s", settings.external_script, extra=AUDIT)
+                if settings.enable_restart_notifications:
                     send_alert("Failed to restart the program.", relaunching=True)
 
         except subprocess.CalledProcessError as e:
-            logging.error(f"Subprocess error while executing the script: {str(e)}", exc_info=True)
-            audit_logger.error(f"Subprocess error while executing the script: {str(e)}", exc_info=True)
+            logging.error("Subprocess error while executing the script: %s", e, exc_info=True, extra=AUDIT)
             send_alert(f"Subprocess error: {str(e)}")
         except Exception as e:
-            logging.critical(f"Unexpected critical error while attempting to execute the script: {str(e)}", exc_info=True)
-            audit_logger.critical(f"Unexpected critical error while attempting to execute the script: {str(e)}", exc_info=True)
+            logging.critical("Unexpected critical error while attempting to execute the script: %s", e, exc_info=True, extra=AUDIT)
             send_alert(f"Unexpected critical error: {str(e)}")
 
         if attempt < retries - 1:
-            logging.info(f"Retrying script execution (Attempt {attempt + 2}/{retries})...")
-            audit_logger.info(f"Retrying script execution (Attempt {attempt + 2}/{retries})...")
+            logging.info("Retrying script execution (Attempt %s/%s)...", attempt + 2, retries, extra=AUDIT)
             time.sleep(5)  # Wait before retrying
 
 # -----------------------------------------------------------------------------
@@ -375,11 +400,9 @@ def graceful_shutdown(signal_received, frame):
     Returns:
         None
     """
-    shutdown_message = config['ttd_heartbeat_Shutdown'].get('shutdown_message', 'Heartbeat Monitor shutting down...')
-    logging.info("Graceful shutdown initiated.")
-    audit_logger.info("Graceful shutdown initiated.")
-    send_alert(shutdown_message)
-    if config.getboolean('ttd_heartbeat_Shutdown', 'perform_cleanup', fallback=True):
+    logging.info("Graceful shutdown initiated.", extra=AUDIT)
+    send_alert(settings.shutdown_message)
+    if settings.perform_cleanup:
         cleanup_logs()
     sys.exit(0)
 
@@ -393,18 +416,53 @@ def cleanup_logs():
     configured number of days.
 
     This function deletes log files that are older than the 'max_log_days' 
-    configuration parameter from the 'log_dir' directory.
+    configuration parameter from the 'log_dir' directory. The scan is skipped 
+    if it already ran within the last day (see ttd_logging.log_cleanup_due()).
 
     Returns:
         None
     """
-    now = time.time()
-    for filename in os.listdir(log_dir):
-        file_path = os.path.join(log_dir, filename)
-        if os.path.isfile(file_path) and now - os.path.getmtime(file_path) > max_log_days * 86400:
-            os.remove(file_path)
-            logging.info(f"Deleted old log file: {filename}")
-            audit_logger.info(f"Deleted old log file: {filename}")
+    if not log_cleanup_due(settings.log_dir):
+        logging.debug("Skipping log cleanup; it ran within the last day.", extra=AUDIT)
+        return
+
+    cutoff = time.time() - settings.max_log_days * 86400
+    with os.scandir(settings.log_dir) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                logging.info("Deleted old log file: %s", entry.name, extra=AUDIT)
+
+    # Record when this cleanup ran
+    try:
+        record_log_cleanup(settings.log_dir)
+    except OSError as e:
+        logging.warning("Failed to update the log cleanup marker: %s", e, extra=AUDIT)
+
+# -----------------------------------------------------------------------------
+# Function: wait_for_next_check
+# Description: Waits for the next heartbeat check, returning early as soon as
+#              a shutdown signal is received.
+# -----------------------------------------------------------------------------
+def wait_for_next_check(timeout):
+    """
+    Waits up to 'timeout' seconds before the next heartbeat check.
+
+    The signal wakeup socket is watched together with the timeout, so SIGINT and
+    SIGTERM end the wait immediately instead of after the full check interval.
+
+    Args:
+        timeout (int): Maximum number of seconds to wait.
+
+    Returns:
+        None
+    """
+    readable, _, _ = select.select([wakeup_reader], [], [], timeout)
+    if readable:
+        try:
+            wakeup_reader.recv(64)  # Drain the signal bytes written by the interpreter
+        except BlockingIOError:
+            pass
 
 # -----------------------------------------------------------------------------
 # Main Execution Loop
@@ -414,21 +472,26 @@ if __name__ == "__main__":
     signal.signal(signal.SIGINT, graceful_shutdown)
     signal.signal(signal.SIGTERM, graceful_shutdown)
 
-    logging.info("Heartbeat Monitor started.")
-    audit_logger.info("Heartbeat Monitor started.")
+    # Have the interpreter write to a socket pair on every signal so the wait between
+    # checks can select() on it (a socket rather than a pipe so select works on Windows)
+    wakeup_reader, wakeup_writer = socket.socketpair()
+    wakeup_reader.setblocking(False)
+    wakeup_writer.setblocking(False)
+    signal.set_wakeup_fd(wakeup_writer.fileno())
+
+    logging.info("Heartbeat Monitor started.", extra=AUDIT)
 
     # Perform initial log cleanup
     cleanup_logs()
 
     while True:
         if not check_heartbeat():
-            logging.warning("Heartbeat not detected. Attempting to start the external script.")
-            audit_logger.warning("Heartbeat not detected. Attempting to start the external script.")
+            logging.warning("Heartbeat not detected. Attempting to start the external script.", extra=AUDIT)
             send_alert("Heartbeat not detected. Attempting to restart the program.", relaunching=True)
             start_external_script()
-            time.sleep(check_interval)  # Wait for the check interval before the next iteration
+            wait_for_next_check(settings.check_interval)  # Wait for the check interval before the next iteration
 
-        time.sleep(check_interval)
+        wait_for_next_check(settings.check_interval)
 
         # Perform periodic log cleanup
         cleanup_logs()
@@ -0,0 +1,182 @@
+import os
+import sys
+import time
+import logging
+import queue
+import atexit
+import functools
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+
+# -----------------------------------------------------------------------------
+# Script Information
+# -----------------------------------------------------------------------------
+# Script Name: ttd_logging.py
+# Version: v1.1.0
+# Author: Quentin King
+# Date: 09-08-2024
+# Description: Shared logging setup for the TwoToneDetect scripts. Creates the
+#              log directory, the rotating file handler and the optional
+#              console handler in one place, reusing a single Formatter per
+#              format string.
+#
+# Version History:
+# - v1.1.0: Added log_cleanup_due() and record_log_cleanup(), shared by the
+#           scripts that gate log cleanup on a marker file, and parse_level().
+# - v1.0.0: Initial version, extracted from ttd_pre_notification.py and
+#           ttd_heartbeat_monitor.py.
+# -----------------------------------------------------------------------------
+
+# Format used when a script does not configure its own
+DEFAULT_LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Logging levels accepted in config.ini
+LOG_LEVELS = {
+    'DEBUG': logging.DEBUG,
+    'INFO': logging.INFO,
+    'WARNING': logging.WARNING,
+    'ERROR': logging.ERROR,
+    'CRITICAL': logging.CRITICAL,
+}
+
+# Marker file in a log directory holding the time its last cleanup ran, and 
+# the minimum spacing between cleanups. Logs age in days, so once a day is enough.
+CLEANUP_MARKER = '.last_cleanup'
+CLEANUP_INTERVAL = 86400
+
+# -----------------------------------------------------------------------------
+# Function: parse_level
+# Description: Converts a config.ini level name to a logging level.
+# -----------------------------------------------------------------------------
+def parse_level(name):
+    """
+    Returns the logging level for a level name, ignoring case.
+
+    Unknown names raise KeyError, so a typo in config.ini stops the script at 
+    startup instead of silently falling back to a default level.
+
+    Args:
+        name (str): The level name, e.g. 'INFO'.
+
+    Returns:
+        int: The logging level.
+    """
+    return LOG_LEVELS[name.strip().upper()]
+
+# -----------------------------------------------------------------------------
+# Function: get_formatter
+# Description: Returns the shared Formatter for a format string.
+# -----------------------------------------------------------------------------
+@functools.lru_cache(maxsize=None)
+def get_formatter(log_format=DEFAULT_LOG_FORMAT):
+    """
+    Returns one Formatter per format string, so every handler shares it.
+
+    Args:
+        log_format (str): The logging format string.
+
+    Returns:
+        logging.Formatter: The formatter for log_format.
+    """
+    return logging.Formatter(log_format)
+
+# -----------------------------------------------------------------------------
+# Function: make_logger
+# Description: Attaches a rotating file handler, and optionally a console
+#              handler, to a logger.
+# -----------------------------------------------------------------------------
+@functools.lru_cache(maxsize=8)
+def make_logger(name, path, max_bytes, backups, to_console, level=logging.DEBUG,
+                log_format=DEFAULT_LOG_FORMAT, handler_class=RotatingFileHandler, queued=False):
+    """
+    Configures a logger to write to a rotating log file.
+
+    Calls with the same arguments return the already configured logger, so
+    handlers are never attached twice.
+
+    Args:
+        name (str): The logger name, or None for the root logger.
+        path (str): The log file path. Its directory is created if needed.
+        max_bytes (int): Size at which the log file is rotated.
+        backups (int): Number of rotated files to keep.
+        to_console (bool): Whether to also log to stdout.
+        level (int, optional): The logger and console level (default is DEBUG).
+        log_format (str, optional): The logging format string.
+        handler_class (type, optional): The RotatingFileHandler class to use.
+        queued (bool, optional): When True, the logger only puts records on a
+            queue and a QueueListener thread does the formatting and writing,
+            so callers on an asyncio event loop never block on disk. The
+            listener is stopped, draining the queue, at interpreter exit.
+
+    Returns:
+        logging.Logger: The configured logger.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    formatter = get_formatter(log_format)
+
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+
+    file_handler = handler_class(path, maxBytes=max_bytes, backupCount=backups)
+    file_handler.setFormatter(formatter)
+    handlers = [file_handler]
+
+    if to_console:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setLevel(level)
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+
+    if queued:
+        log_queue = queue.Queue(-1)
+        listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        # Registered after logging's own shutdown hook, so it runs first
+        atexit.register(listener.stop)
+        handlers = [QueueHandler(log_queue)]
+
+    for handler in handlers:
+        logger.addHandler(handler)
+
+    return logger
+
+# -----------------------------------------------------------------------------
+# Function: log_cleanup_due
+# Description: Checks whether a log directory is due for cleanup.
+# -----------------------------------------------------------------------------
+def log_cleanup_due(log_dir, interval=CLEANUP_INTERVAL):
+    """
+    Checks whether log cleanup is due for a log directory.
+
+    The time of the last cleanup is read from the CLEANUP_MARKER file written 
+    by record_log_cleanup(). A missing or unreadable marker counts as due.
+
+    Args:
+        log_dir (str): The log directory.
+        interval (float, optional): Minimum seconds between cleanups (default is one day).
+
+    Returns:
+        bool: True if cleanup has not run within the last interval seconds.
+    """
+    try:
+        with open(os.path.join(log_dir, CLEANUP_MARKER)) as marker:
+            last_cleanup = float(marker.read() or 0)
+    except (OSError, ValueError):
+        return True
+    return time.time() - last_cleanup > interval
+
+# -----------------------------------------------------------------------------
+# Function: record_log_cleanup
+# Description: Records that a log directory was just cleaned up.
+# -----------------------------------------------------------------------------
+def record_log_cleanup(log_dir):
+    """
+    Writes the current time to the CLEANUP_MARKER file in a log directory.
+
+    Args:
+        log_dir (str): The log directory.
+
+    Raises:
+        OSError: If the marker file cannot be written.
+    """
+    with open(os.path.join(log_dir, CLEANUP_MARKER), 'w') as marker:
+        marker.write(str(time.time()))
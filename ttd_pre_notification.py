@@ -2,18 +2,28 @@ import configparser
 import os
 import logging
 from logging.handlers import RotatingFileHandler
-import requests
-import sys
+import asyncio
+import random
 import argparse
-from time import sleep
-from datetime import datetime
-from dotenv import load_dotenv
+import functools
+import json
+import time
+import signal
+from dataclasses import dataclass
+
+from ttd_logging import make_logger, parse_level
+
+# Exclusive file locks for the breaker and dead-letter files shared between runs
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
 
 # -----------------------------------------------------------------------------
 # Script Information
 # -----------------------------------------------------------------------------
 # Script Name: ttd_pre_notification.py
-# Version: v1.8.0
+# Version: v1.9.0
 # Author: Quentin King
 # Date: 09-01-2024
 # Description: This script sends a pre-notification webhook to Node-RED with 
@@ -22,17 +32,15 @@ from dotenv import load_dotenv
 #              mechanisms with exponential backoff. Configuration settings are 
 #              loaded from shared INI files for flexibility and ease of use.
 # Changelog:
+# - v1.9.0: Switched webhook delivery to aiohttp. The primary and secondary webhook 
+#           URLs are delivered concurrently over one shared session, and a Pushover 
+#           error notification is sent when every delivery fails.
 # - v1.8.0: Moved sensitive credentials to environment variables, updated logging 
 #           configuration, and enhanced error handling in Pushover notifications.
 # - v1.7.9: Fixed issue where cleanup_logs() was called before logging was configured, 
 #           causing an AttributeError. Moved cleanup_logs() call after logging setup.
 # -----------------------------------------------------------------------------
 
-# -----------------------------------------------------------------------------
-# Load Environment Variables
-# -----------------------------------------------------------------------------
-load_dotenv()
-
 # -----------------------------------------------------------------------------
 # Configuration
 # -----------------------------------------------------------------------------
@@ -42,180 +50,749 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 # Define the path to the config.ini file
 config_path = os.path.join(script_dir, 'config.ini')
 
-# Load configuration from the config.ini file
-config = configparser.ConfigParser()
-config.read(config_path)
+# Minimum spacing in seconds between Pushover error notifications
+_pushover_safe_interval = 30
+_last_pushover_ts = None
+_suppressed_pushover_count = 0
 
-# Access the Logging configuration
-log_dir = os.path.join(script_dir, config['ttd_pre_notification_Logging']['log_dir'])
-log_level = config['ttd_pre_notification_Logging']['log_level']
-max_logs = int(config['ttd_pre_notification_Logging']['max_logs'])
-max_log_size = int(config['ttd_pre_notification_Logging']['max_log_size'])
-log_to_console = config.getboolean('ttd_pre_notification_Logging', 'log_to_console')
-verbose_logging = config.getboolean('ttd_pre_notification_Logging', 'verbose_logging')
-max_log_days = int(config['ttd_pre_notification_Logging']['max_log_days'])
+# Set while this process is replaying the dead-letter file
+_draining = False
 
-# Ensure the log directory exists
-if not os.path.exists(log_dir):
-    os.makedirs(log_dir)
+# Circuit breaker: after this many consecutive failed events, skip webhooks 
+# for the cooldown period instead of burning retries against a dead endpoint
+breaker_threshold = 5
+breaker_cooldown = 300
 
-# Configure rotating file handler for logging
-log_file_name = f"pre_notification_{datetime.now().strftime('%m-%d-%Y_%H-%M-%S')}.log"
-log_file_path = os.path.join(log_dir, log_file_name)
+# A dead-lettered webhook is dropped after this many failed replays, so one 
+# entry the endpoint keeps failing on cannot hold up the rest of the file
+dead_letter_max_attempts = 5
 
-handler = RotatingFileHandler(
-    log_file_path, maxBytes=max_log_size, backupCount=max_logs
-)
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
+# The daemon answers each queued event with this line; anything else, or no 
+# answer within daemon_ack_timeout seconds, means the event was not accepted
+DAEMON_ACK = b"OK\n"
+daemon_ack_timeout = 2
 
-logging.basicConfig(
-    level=logging.DEBUG,  # Set to DEBUG level
-    handlers=[handler]
-)
+# Seconds the daemon waits at shutdown for events being sent before it 
+# cancels them and saves them to the dead-letter file
+daemon_shutdown_grace = 10
 
-if log_to_console:
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.DEBUG)
-    console_handler.setFormatter(formatter)
-    logging.getLogger().addHandler(console_handler)
+# Headers for webhook requests whose body is pre-encoded JSON
+JSON_HEADERS = {'Content-Type': 'application/json'}
 
-logging.info("Logging initialized.")
-logging.info(f"Logs will be stored in: {log_dir}")
-logging.info(f"Log file: {log_file_name}")
+# Settings for this process, populated on the first call to configure()
+_SETTINGS = None
 
 # -----------------------------------------------------------------------------
-# Log Cleanup Function
+# Function: load_config
+# Description: Loads config.ini.
 # -----------------------------------------------------------------------------
-def cleanup_logs():
+def load_config():
     """
-    Cleans up old log files in the specified directory based on age and the number of logs.
-    This function deletes log files that are older than the 'max_log_days' configuration
-    parameter or if the total number of logs exceeds the 'max_logs' limit.
-    
+    Loads the configuration from config.ini.
+
     Returns:
-        None
+        configparser.ConfigParser: The parsed configuration.
     """
-    logging.debug("Entered cleanup_logs function.")
-    now = datetime.now().timestamp()
-    logs = []
-    
-    # Gather all logs and their ages
-    for filename in os.listdir(log_dir):
-        file_path = os.path.join(log_dir, filename)
-        if os.path.isfile(file_path):
-            file_age = now - os.path.getmtime(file_path)
-            logs.append((file_path, file_age))
-    
-    # Sort logs by age (oldest first)
-    logs.sort(key=lambda x: x[1], reverse=False)
-    
-    # Get the current log file path to avoid deletion
-    current_log_file = log_file_path
-
-    # Delete logs based on age
-    deleted_files_count = 0
-    for file_path, file_age in logs:
-        if file_path == current_log_file:
-            logging.debug(f"Skipping current log file: {os.path.basename(file_path)}")
-            continue
-        if file_age > max_log_days * 86400:
-            os.remove(file_path)
-            logging.info(f"Deleted old log file: {os.path.basename(file_path)}")
-            deleted_files_count += 1
-    
-    # Re-evaluate logs after age-based cleanup
-    logs = [(fp, fa) for fp, fa in logs if os.path.exists(fp)]
-    
-    # If number of logs exceeds max_logs, delete the oldest ones
-    if len(logs) > max_logs:
-        logs_to_delete = len(logs) - max_logs
-        for i in range(logs_to_delete):
-            if logs[i][0] == current_log_file:
-                logging.debug(f"Skipping current log file: {os.path.basename(logs[i][0])}")
-                continue
-            os.remove(logs[i][0])
-            logging.info(f"Deleted excess log file: {os.path.basename(logs[i][0])}")
-            deleted_files_count += 1
-    
-    if deleted_files_count == 0:
-        logging.info("No old or excess log files were found for deletion.")
+    parser = configparser.ConfigParser()
+    parser.read(config_path)
+    return parser
+
+# -----------------------------------------------------------------------------
+# Class: SizeRotatingFileHandler
+# Description: RotatingFileHandler that decides on rollover from the current 
+#              file size alone, without formatting the record a second time.
+# -----------------------------------------------------------------------------
+class SizeRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that skips formatting the record in shouldRollover().
+
+    The stock handler formats every record once to measure it and again in 
+    emit() to write it. This subclass rolls over once the file has reached 
+    maxBytes, so each record is formatted only once. A file may overshoot 
+    maxBytes by at most one record.
+    """
+    def shouldRollover(self, record):
+        if self.maxBytes <= 0:
+            return False
+        if self.stream is None:
+            self.stream = self._open()
+        return self.stream.tell() >= self.maxBytes
+
+# -----------------------------------------------------------------------------
+# Settings
+# -----------------------------------------------------------------------------
+@dataclass(frozen=True)
+class Settings:
+    """Read-only view of the config.ini and .env values used by the script."""
+    # Logging
+    log_dir: str
+    log_level: int
+    max_logs: int
+    max_log_size: int
+    log_to_console: bool
+    verbose_logging: bool
+    # Pushover: the static part of every request; only "message" varies per call
+    pushover_payload: dict
+    # Webhook
+    webhook_url: str
+    secondary_webhook_url: str
+    base_audio_url: str
+    timeout_seconds: int
+    # Retry logic
+    max_retries: int
+    initial_backoff: int
+    backoff_multiplier: int
+    max_backoff: float
+    jitter_ratio: float
+    # File handling
+    temp_directory: str
+    file_name_format: str
+    # Notification content
+    title_prefix: str
+    message_template: str
+    # Daemon
+    daemon_host: str
+    daemon_port: int
+    batch_window: float
+
+def load_settings(config):
+    """
+    Reads every setting the script needs from config.ini and the environment.
+
+    Args:
+        config (configparser.ConfigParser): The parsed config.ini.
+
+    Returns:
+        Settings: The settings for this process.
+    """
+    return Settings(
+        log_dir=os.path.join(script_dir, config['ttd_pre_notification_Logging']['log_dir']),
+        log_level=parse_level(config['ttd_pre_notification_Logging']['log_level']),
+        max_logs=int(config['ttd_pre_notification_Logging']['max_logs']),
+        max_log_size=int(config['ttd_pre_notification_Logging']['max_log_size']),
+        log_to_console=config.getboolean('ttd_pre_notification_Logging', 'log_to_console'),
+        verbose_logging=config.getboolean('ttd_pre_notification_Logging', 'verbose_logging'),
+        # Credentials come from environment variables
+        pushover_payload={
+            "token": os.getenv('PUSHOVER_TOKEN'),
+            "user": os.getenv('PUSHOVER_USER'),
+            "priority": int(config['ttd_pre_notification_Pushover']['priority']),
+            "retry": int(config['ttd_pre_notification_Pushover']['retry']),
+            "expire": int(config['ttd_pre_notification_Pushover']['expire']),
+            "sound": config['ttd_pre_notification_Pushover']['sound'],
+        },
+        webhook_url=config['ttd_pre_notification_Webhook']['tone_detected_url'],
+        secondary_webhook_url=config['ttd_pre_notification_Webhook'].get('secondary_webhook_url', ''),
+        base_audio_url=config['ttd_pre_notification_Webhook']['base_audio_url'],
+        timeout_seconds=int(config['ttd_pre_notification_Webhook']['timeout_seconds']),
+        max_retries=int(config['ttd_pre_notification_Retry']['max_retries']),
+        initial_backoff=int(config['ttd_pre_notification_Retry']['initial_backoff']),
+        backoff_multiplier=int(config['ttd_pre_notification_Retry']['backoff_multiplier']),
+        max_backoff=config.getfloat('ttd_pre_notification_Retry', 'max_backoff', fallback=30),
+        jitter_ratio=config.getfloat('ttd_pre_notification_Retry', 'jitter_ratio', fallback=0.5),
+        temp_directory=os.path.join(script_dir, config['ttd_pre_notification_FileHandling']['temp_directory']),
+        file_name_format=config['ttd_pre_notification_FileHandling']['file_name_format'],
+        title_prefix=config['ttd_pre_notification_NotificationContent']['title_prefix'],
+        message_template=config['ttd_pre_notification_NotificationContent']['message_template'],
+        # The Daemon section is optional
+        daemon_host=config.get('ttd_pre_notification_Daemon', 'host', fallback='127.0.0.1'),
+        daemon_port=config.getint('ttd_pre_notification_Daemon', 'port', fallback=8765),
+        batch_window=config.getint('ttd_pre_notification_Daemon', 'batch_window_ms', fallback=50) / 1000,
+    )
+
+# -----------------------------------------------------------------------------
+# Function: configure
+# Description: Loads environment variables and config.ini and sets up logging. 
+#              Runs only once; later calls return the cached settings.
+# -----------------------------------------------------------------------------
+def configure():
+    """
+    Loads the settings and initializes logging on first use.
+
+    Importing this module does no I/O. The INI parse, directory creation 
+    and logging setup all happen on the first call to configure(). 
+    Later calls return the cached settings immediately, so a long-lived 
+    caller pays the setup cost once rather than once per tone event.
+
+    Returns:
+        Settings: The settings for this process.
+    """
+    global _SETTINGS
+
+    if _SETTINGS is not None:
+        return _SETTINGS
+
+    # Only read .env when the credentials are not already in the environment; 
+    # python-dotenv is imported here so a pre-populated environment skips it entirely
+    if not (os.getenv('PUSHOVER_TOKEN') and os.getenv('PUSHOVER_USER')):
+        from dotenv import load_dotenv
+        load_dotenv()
+    settings = load_settings(load_config())
+
+    # Log to a single stable file name so the rotating handler caps disk usage at 
+    # max_logs backups on its own. Records are queued and written by a listener 
+    # thread, so logging never blocks the event loop on disk I/O.
+    log_file_name = "pre_notification.log"
+    make_logger(
+        None, os.path.join(settings.log_dir, log_file_name), settings.max_log_size, settings.max_logs,
+        settings.log_to_console, level=settings.log_level, handler_class=SizeRotatingFileHandler, queued=True
+    )
+
+    logging.info("Logging initialized.")
+    logging.info("Logs will be stored in: %s", settings.log_dir)
+    logging.info("Log file: %s", log_file_name)
+
+    # Ensure the temp directory exists
+    os.makedirs(settings.temp_directory, exist_ok=True)
+    logging.info("Temporary files will be stored in: %s", settings.temp_directory)
+    logging.info("Settings loaded.")
+
+    _SETTINGS = settings
+    return _SETTINGS
+
+# Connection pool limits for the shared aiohttp session. Keep-alive lets retries 
+# and the Pushover call reuse an open TCP/TLS connection instead of reconnecting.
+connector_limit = 8
+connector_limit_per_host = 4
+connector_keepalive_timeout = 30
+
+# -----------------------------------------------------------------------------
+# Function: get_backoff_delay
+# Description: Computes the jittered exponential backoff before a retry.
+# -----------------------------------------------------------------------------
+def get_backoff_delay(settings, attempt_number):
+    """
+    Returns the delay before retrying after the given failed attempt.
+
+    The delay grows as initial_backoff * backoff_multiplier ** (attempt - 1), is 
+    stretched by a random factor of up to jitter_ratio so that processes failing 
+    together do not retry in lockstep, and is capped at max_backoff.
+
+    Args:
+        settings (Settings): The script settings.
+        attempt_number (int): The 1-based number of the attempt that just failed.
+
+    Returns:
+        float: The number of seconds to wait before the next attempt.
+    """
+    backoff_time = settings.initial_backoff * settings.backoff_multiplier ** (attempt_number - 1)
+    return min(backoff_time * (1 + random.uniform(0, settings.jitter_ratio)), settings.max_backoff)
+
+# -----------------------------------------------------------------------------
+# Function: get_retry_after
+# Description: Reads the Retry-After header from a rate-limited response.
+# -----------------------------------------------------------------------------
+def get_retry_after(http_err, default, max_delay):
+    """
+    Returns the delay requested by a 429 response's Retry-After header.
+
+    Args:
+        http_err (aiohttp.ClientResponseError): The rate-limited response error.
+        default (float): Delay to use when the header is missing or not in seconds.
+        max_delay (float): Upper bound for the returned delay.
+
+    Returns:
+        float: The number of seconds to wait before retrying.
+    """
+    retry_after = (http_err.headers or {}).get('Retry-After')
+    try:
+        return min(max(float(retry_after), 0), max_delay)
+    except (TypeError, ValueError):
+        return default
+
+# -----------------------------------------------------------------------------
+# Function: get_error_labels
+# Description: Returns the table that maps webhook errors to their log labels.
+# -----------------------------------------------------------------------------
+@functools.lru_cache(maxsize=None)
+def get_error_labels():
+    """
+    Returns the log label for each webhook error type.
+
+    Entries are matched in order, so subclasses must come before their base 
+    classes.
+
+    Returns:
+        tuple: (exception type, log label) entries.
+    """
+    import aiohttp  # Imported lazily; see create_session()
+    return (
+        (aiohttp.ClientConnectionError, "Connection Error"),
+        (asyncio.TimeoutError, "Timeout Error"),
+        (aiohttp.ClientResponseError, "HTTP Error"),
+        (aiohttp.ClientError, "General Webhook Error"),
+    )
+
+# -----------------------------------------------------------------------------
+# Function: match_error_label
+# Description: Looks up the log label for a webhook error.
+# -----------------------------------------------------------------------------
+def match_error_label(err):
+    """
+    Returns the log label for a webhook error.
+
+    Args:
+        err (Exception): The error raised by the webhook request.
+
+    Returns:
+        str: The label used in retry and failure log messages.
+    """
+    return next(label for exc_type, label in get_error_labels() if isinstance(err, exc_type))
+
+# -----------------------------------------------------------------------------
+# Function: is_retryable
+# Description: Decides whether a webhook error is worth retrying.
+# -----------------------------------------------------------------------------
+def is_retryable(err):
+    """
+    Returns False for client errors (4xx other than 429), which will not 
+    succeed on retry, and True for everything else.
+
+    Args:
+        err (Exception): The error raised by the webhook request.
+
+    Returns:
+        bool: True if the request should be retried.
+    """
+    status = getattr(err, 'status', None)
+    return not (status is not None and 400 <= status < 500 and status != 429)
+
+# -----------------------------------------------------------------------------
+# Function: deliver_webhook
+# Description: Delivers the webhook payload to a single URL, retrying through 
+#              tenacity with jittered exponential backoff.
+# -----------------------------------------------------------------------------
+async def deliver_webhook(session, settings, url, body, retries, errors=None, rejected=None):
+    """
+    Posts the webhook payload to one URL, retrying on failure.
+
+    Retries are driven by tenacity.AsyncRetrying, up to the specified number 
+    of attempts, using exponential backoff with random jitter, capped at 
+    max_backoff (see get_backoff_delay()). Client errors (4xx other than 429) 
+    fail immediately, and 429 responses honor the Retry-After header.
+
+    Args:
+        session (aiohttp.ClientSession): The shared session used for the request.
+        settings (Settings): The script settings.
+        url (str): The webhook URL to post to.
+        body (bytes): The JSON-encoded payload to send.
+        retries (int): Number of attempts before giving up.
+        errors (list, optional): Receives a one-line summary of the final error on failure.
+        rejected (list, optional): Receives the URL if it rejected the payload with a client error.
+
+    Returns:
+        bool: True if the webhook was delivered, False otherwise.
+    """
+    import aiohttp  # Imported lazily; see create_session()
+    from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt
+
+    def compute_wait(retry_state):
+        err = retry_state.outcome.exception()
+        delay = get_backoff_delay(settings, retry_state.attempt_number)
+        if getattr(err, 'status', None) == 429:
+            return get_retry_after(err, delay, settings.max_backoff)
+        return delay
+
+    def log_retry(retry_state):
+        label = match_error_label(retry_state.outcome.exception())
+        logging.info("Retrying in %.2f seconds due to %s...", retry_state.next_action.sleep, label)
+
+    retrying = AsyncRetrying(
+        stop=stop_after_attempt(retries),
+        retry=retry_if_exception(is_retryable),
+        wait=compute_wait,
+        before_sleep=log_retry,
+        reraise=True
+    )
+
+    logging.debug("Entered deliver_webhook function for %s.", url)
+    try:
+        async for attempt in retrying:
+            with attempt:
+                attempt_number = attempt.retry_state.attempt_number
+                logging.info("Attempt %s to send webhook to %s.", attempt_number, url)
+                try:
+                    async with session.post(url, data=body, headers=JSON_HEADERS, timeout=aiohttp.ClientTimeout(total=settings.timeout_seconds)) as response:
+                        response.raise_for_status()  # Raise a ClientResponseError for bad responses
+                except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                    logging.error("Attempt %s: %s: %s", attempt_number, match_error_label(err), err)
+                    raise
+
+    except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+        if is_retryable(err):
+            logging.error("Webhook to %s failed after all retry attempts.", url)
+            summary = f"{url}: {type(err).__name__}: {err}"
+        else:
+            logging.error("Webhook to %s rejected with status %s; not retrying.", url, err.status)
+            summary = f"{url}: HTTP {err.status} {err.message}"
+            if rejected is not None:
+                rejected.append(url)
+        if errors is not None:
+            errors.append(summary)
+        logging.debug("Exiting deliver_webhook function after failure.")
+        return False
+
+    logging.info("Webhook sent successfully to %s.", url)
+    logging.debug("Exiting deliver_webhook function after success.")
+    return True
+
+# -----------------------------------------------------------------------------
+# Function: lock_file
+# Description: Takes an exclusive lock on an open file.
+# -----------------------------------------------------------------------------
+def lock_file(state_file):
+    """
+    Blocks until this process holds an exclusive lock on the open file.
+
+    Args:
+        state_file (file): The open file to lock.
+    """
+    if os.name == 'nt':
+        state_file.seek(0)
+        msvcrt.locking(state_file.fileno(), msvcrt.LK_LOCK, 1)
     else:
-        logging.info(f"Deleted {deleted_files_count} old or excess log file(s).")
-    
-    logging.debug("Exiting cleanup_logs function.")
-
-# Now that logging is configured, run cleanup
-cleanup_logs()
-
-# -----------------------------------------------------------------------------
-# Access other configurations
-# -----------------------------------------------------------------------------
-# Access the Pushover credentials and settings from environment variables
-logging.debug("Loading Pushover settings.")
-pushover_app_token = os.getenv('PUSHOVER_TOKEN')
-pushover_user_key = os.getenv('PUSHOVER_USER')
-pushover_priority = int(config['ttd_pre_notification_Pushover']['priority'])
-pushover_retry = int(config['ttd_pre_notification_Pushover']['retry'])
-pushover_expire = int(config['ttd_pre_notification_Pushover']['expire'])
-pushover_sound = config['ttd_pre_notification_Pushover']['sound']
-logging.info("Pushover settings loaded.")
-
-# Access the Webhook and base audio URL
-logging.debug("Loading Webhook settings.")
-webhook_url = config['ttd_pre_notification_Webhook']['tone_detected_url']
-base_audio_url = config['ttd_pre_notification_Webhook']['base_audio_url']
-secondary_webhook_url = config['ttd_pre_notification_Webhook']['secondary_webhook_url']
-timeout_seconds = int(config['ttd_pre_notification_Webhook']['timeout_seconds'])
-logging.info("Webhook settings loaded.")
-
-# Access the Retry logic settings
-logging.debug("Loading Retry logic settings.")
-max_retries = int(config['ttd_pre_notification_Retry']['max_retries'])
-initial_backoff = int(config['ttd_pre_notification_Retry']['initial_backoff'])
-backoff_multiplier = int(config['ttd_pre_notification_Retry']['backoff_multiplier'])
-logging.info("Retry logic settings loaded.")
-
-# Access the File Handling settings
-logging.debug("Loading File Handling settings.")
-temp_directory = os.path.join(script_dir, config['ttd_pre_notification_FileHandling']['temp_directory'])
-file_name_format = config['ttd_pre_notification_FileHandling']['file_name_format']
-# Ensure the temp directory exists
-if not os.path.exists(temp_directory):
-    os.makedirs(temp_directory)
-logging.info(f"Temporary files will be stored in: {temp_directory}")
-
-# Access the Notification Content settings
-logging.debug("Loading Notification Content settings.")
-title_prefix = config['ttd_pre_notification_NotificationContent']['title_prefix']
-message_template = config['ttd_pre_notification_NotificationContent']['message_template']
-logging.info("Notification content settings loaded.")
+        fcntl.flock(state_file.fileno(), fcntl.LOCK_EX)
 
 # -----------------------------------------------------------------------------
-# Function: send_webhook
-# Description: Sends a webhook to Node-RED with retry mechanism and tailored 
-#              exception handling. Uses exponential backoff for retries.
+# Function: unlock_file
+# Description: Releases a lock taken with lock_file().
 # -----------------------------------------------------------------------------
-def send_webhook(file_name, topic, retries=max_retries):
+def unlock_file(state_file):
     """
-    Sends a webhook to Node-RED with the audio file URL and relevant details.
+    Releases a lock taken with lock_file().
+
+    Args:
+        state_file (file): The open file to unlock.
+    """
+    if os.name == 'nt':
+        state_file.seek(0)
+        msvcrt.locking(state_file.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(state_file.fileno(), fcntl.LOCK_UN)
 
-    This function attempts to send a webhook with the specified audio file and 
-    topic. If the request fails, it retries up to the specified number of times, 
-    using exponential backoff.
+# -----------------------------------------------------------------------------
+# Function: parse_breaker_state
+# Description: Decodes the circuit breaker state file contents.
+# -----------------------------------------------------------------------------
+def parse_breaker_state(text):
+    """
+    Decodes the circuit breaker state, treating missing or corrupt data as closed.
+
+    Args:
+        text (str): The contents of the state file.
+
+    Returns:
+        dict: The breaker state with 'failures' and 'opened_at' keys.
+    """
+    try:
+        state = json.loads(text)
+        return {"failures": int(state["failures"]), "opened_at": float(state["opened_at"])}
+    except (ValueError, KeyError, TypeError):
+        return {"failures": 0, "opened_at": 0.0}
+
+# -----------------------------------------------------------------------------
+# Function: load_breaker_state
+# Description: Reads the circuit breaker state shared by all runs of the script.
+# -----------------------------------------------------------------------------
+def load_breaker_state(settings):
+    """
+    Reads the circuit breaker state from _breaker.json in the temp directory.
+
+    Args:
+        settings (Settings): The script settings.
+
+    Returns:
+        dict: The breaker state with 'failures' and 'opened_at' keys.
+    """
+    try:
+        with open(os.path.join(settings.temp_directory, '_breaker.json')) as state_file:
+            return parse_breaker_state(state_file.read())
+    except OSError:
+        return parse_breaker_state('')
+
+# -----------------------------------------------------------------------------
+# Function: update_breaker_state
+# Description: Records the outcome of an event in the shared breaker state.
+# -----------------------------------------------------------------------------
+def update_breaker_state(settings, delivered):
+    """
+    Records a delivered or failed event in _breaker.json.
+
+    The read, update and write happen under an exclusive file lock, so tone 
+    events that fire at the same time cannot lose each other's failure counts.
+
+    Args:
+        settings (Settings): The script settings.
+        delivered (bool): Whether the event reached at least one endpoint.
+    """
+    try:
+        with open(os.path.join(settings.temp_directory, '_breaker.json'), 'a+') as state_file:
+            lock_file(state_file)
+            try:
+                state_file.seek(0)
+                state = parse_breaker_state(state_file.read())
+                if delivered:
+                    state = {"failures": 0, "opened_at": 0.0}
+                else:
+                    state["failures"] += 1
+                    if state["failures"] >= breaker_threshold:
+                        logging.warning("Opening circuit breaker for %s seconds.", breaker_cooldown)
+                        state["opened_at"] = time.time()
+                state_file.seek(0)
+                state_file.truncate()
+                json.dump(state, state_file)
+                state_file.flush()
+            finally:
+                unlock_file(state_file)
+    except OSError as e:
+        logging.warning("Failed to save circuit breaker state: %s", e)
+
+# -----------------------------------------------------------------------------
+# Function: breaker_is_open
+# Description: Checks whether the circuit breaker is currently skipping webhooks.
+# -----------------------------------------------------------------------------
+def breaker_is_open(breaker_state):
+    """
+    Checks whether the breaker has tripped and is still within its cooldown.
+
+    Args:
+        breaker_state (dict): The breaker state with 'failures' and 'opened_at' keys.
+
+    Returns:
+        bool: True if webhooks should be skipped, False otherwise.
+    """
+    return (breaker_state["failures"] >= breaker_threshold
+            and time.time() - breaker_state["opened_at"] < breaker_cooldown)
+
+# -----------------------------------------------------------------------------
+# Function: append_dead_letter
+# Description: Saves an undelivered webhook so it can be replayed later.
+# -----------------------------------------------------------------------------
+def append_dead_letter(settings, entry):
+    """
+    Appends one undelivered webhook to webhook_deadletter.jsonl in the temp directory.
 
     Args:
+        settings (Settings): The script settings.
+        entry (dict): The webhook with 'ts', 'url' and 'payload' keys.
+    """
+    try:
+        with open(os.path.join(settings.temp_directory, 'webhook_deadletter.jsonl'), 'a', buffering=1) as dead_letter_file:
+            lock_file(dead_letter_file)
+            try:
+                dead_letter_file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            finally:
+                unlock_file(dead_letter_file)
+        logging.info("Saved undelivered webhook for %s to the dead-letter file.", entry["url"])
+    except OSError as e:
+        logging.error("Failed to save undelivered webhook for %s: %s", entry["url"], e)
+
+# -----------------------------------------------------------------------------
+# Function: recover_dead_letters
+# Description: Returns dead-letter files claimed by runs that died mid-replay 
+#              to the dead-letter queue.
+# -----------------------------------------------------------------------------
+def recover_dead_letters(settings):
+    """
+    Moves the entries of orphaned webhook_deadletter.jsonl.<pid> files back 
+    into webhook_deadletter.jsonl.
+
+    drain_dead_letters() claims the queue by renaming it after its own pid. If 
+    that process dies before it finishes, the claimed file would never be read 
+    again. Files whose process is gone, or whose pid this process now has, are 
+    appended to the queue under its lock and removed.
+
+    Args:
+        settings (Settings): The script settings.
+    """
+    import psutil  # Imported lazily; only replays need it
+
+    dead_letter_path = os.path.join(settings.temp_directory, 'webhook_deadletter.jsonl')
+    prefix = 'webhook_deadletter.jsonl.'
+    try:
+        with os.scandir(settings.temp_directory) as entries:
+            stale_paths = [
+                entry.path for entry in entries
+                if entry.name.startswith(prefix) and entry.name[len(prefix):].isdigit()
+                and (int(entry.name[len(prefix):]) == os.getpid() or not psutil.pid_exists(int(entry.name[len(prefix):])))
+            ]
+        for stale_path in stale_paths:
+            with open(stale_path) as stale_file:
+                lines = [line if line.endswith("\n") else line + "\n" for line in stale_file if line.strip()]
+            with open(dead_letter_path, 'a') as dead_letter_file:
+                lock_file(dead_letter_file)
+                try:
+                    dead_letter_file.writelines(lines)
+                finally:
+                    unlock_file(dead_letter_file)
+            os.remove(stale_path)
+            logging.warning("Recovered %s webhook(s) from orphaned dead-letter file %s.", len(lines), stale_path)
+    except OSError as e:
+        logging.error("Failed to recover orphaned dead-letter files: %s", e)
+
+# -----------------------------------------------------------------------------
+# Function: claim_dead_letters
+# Description: Takes the dead-letter file for replay and reads its entries.
+# -----------------------------------------------------------------------------
+def claim_dead_letters(settings):
+    """
+    Claims webhook_deadletter.jsonl for this process and reads its entries.
+
+    Orphaned claims are recovered first (see recover_dead_letters()). The file 
+    is then renamed after this process's pid, so concurrent runs never replay 
+    the same entry twice.
+
+    Args:
+        settings (Settings): The script settings.
+
+    Returns:
+        tuple: The claimed file path and its entries, or (None, []) if there 
+        is nothing to replay.
+    """
+    recover_dead_letters(settings)
+
+    dead_letter_path = os.path.join(settings.temp_directory, 'webhook_deadletter.jsonl')
+    claimed_path = f"{dead_letter_path}.{os.getpid()}"
+    try:
+        os.replace(dead_letter_path, claimed_path)
+    except FileNotFoundError:
+        return None, []
+    except OSError as e:
+        logging.warning("Failed to claim the dead-letter file: %s", e)
+        return None, []
+
+    entries = []
+    with open(claimed_path) as claimed_file:
+        for line in claimed_file:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                logging.error("Discarding malformed dead-letter entry: %s", line.strip())
+    return claimed_path, entries
+
+# -----------------------------------------------------------------------------
+# Function: release_dead_letters
+# Description: Puts unreplayed entries back and removes the claimed file.
+# -----------------------------------------------------------------------------
+def release_dead_letters(settings, claimed_path, entries):
+    """
+    Appends the entries still to be delivered to webhook_deadletter.jsonl 
+    under one lock, then removes the claimed file.
+
+    Args:
+        settings (Settings): The script settings.
+        claimed_path (str): The file returned by claim_dead_letters().
+        entries (list): The entries to keep for a later replay.
+    """
+    if entries:
+        with open(os.path.join(settings.temp_directory, 'webhook_deadletter.jsonl'), 'a') as dead_letter_file:
+            lock_file(dead_letter_file)
+            try:
+                dead_letter_file.writelines(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries)
+            finally:
+                unlock_file(dead_letter_file)
+        logging.info("Kept %s undelivered webhook(s) for a later replay.", len(entries))
+    os.remove(claimed_path)
+
+# -----------------------------------------------------------------------------
+# Function: drain_dead_letters
+# Description: Replays webhooks saved by append_dead_letter().
+# -----------------------------------------------------------------------------
+async def drain_dead_letters(session, settings):
+    """
+    Replays undelivered webhooks from the dead-letter file, oldest first.
+
+    Each entry gets a single attempt per replay, without backoff. An entry 
+    whose URL rejects it with a client error is dropped. Any other failure 
+    counts against the entry, which is dropped after dead_letter_max_attempts 
+    replays, and the rest of that URL's entries are put back untried, so a 
+    down endpoint costs one request per replay. Nothing is replayed while the 
+    circuit breaker is open.
+
+    This runs in the daemon and with --drain, never on the path of a 
+    one-shot tone event. All file I/O runs in the default executor, so a 
+    large backlog never stalls the daemon's event loop.
+
+    Args:
+        session (aiohttp.ClientSession): The shared session used for the requests.
+        settings (Settings): The script settings.
+    """
+    global _draining
+
+    if _draining:
+        return
+
+    loop = asyncio.get_running_loop()
+    _draining = True
+    try:
+        if breaker_is_open(await loop.run_in_executor(None, load_breaker_state, settings)):
+            return
+
+        claimed_path, entries = await loop.run_in_executor(None, claim_dead_letters, settings)
+        if claimed_path is None:
+            return
+
+        logging.info("Replaying %s undelivered webhook(s).", len(entries))
+        down_urls = set()
+        kept = []
+        for entry in entries:
+            url = entry["url"]
+            if url in down_urls:
+                kept.append(entry)
+                continue
+            body = json.dumps(entry["payload"], separators=(",", ":")).encode()
+            rejected = []
+            if await deliver_webhook(session, settings, url, body, 1, rejected=rejected):
+                continue
+            attempts = entry.get("attempts", 0) + 1
+            if rejected:
+                logging.error("Dropping dead-lettered webhook for %s: rejected by the endpoint.", url)
+            elif attempts >= dead_letter_max_attempts:
+                logging.error("Dropping dead-lettered webhook for %s after %s failed replays.", url, attempts)
+            else:
+                down_urls.add(url)
+                kept.append({**entry, "attempts": attempts})
+        await loop.run_in_executor(None, release_dead_letters, settings, claimed_path, kept)
+    except OSError as e:
+        logging.error("Failed to replay the dead-letter file: %s", e)
+    finally:
+        _draining = False
+
+# -----------------------------------------------------------------------------
+# Function: get_webhook_urls
+# Description: Returns the URLs every webhook is delivered to.
+# -----------------------------------------------------------------------------
+def get_webhook_urls(settings):
+    """
+    Returns the primary webhook URL and, when configured, the secondary one.
+
+    Args:
+        settings (Settings): The script settings.
+
+    Returns:
+        list: The webhook URLs.
+    """
+    return [settings.webhook_url] + ([settings.secondary_webhook_url] if settings.secondary_webhook_url else [])
+
+# -----------------------------------------------------------------------------
+# Function: build_webhook_payload
+# Description: Builds the webhook payload for one tone event.
+# -----------------------------------------------------------------------------
+def build_webhook_payload(settings, file_name, topic):
+    """
+    Builds the webhook payload with the audio file URL and topic.
+
+    Args:
+        settings (Settings): The script settings.
         file_name (str): The name of the audio file to be included in the webhook.
         topic (str): The topic for the webhook and notification.
-        retries (int): Number of retry attempts for sending the webhook (default is max_retries).
 
     Returns:
-        bool: True if the webhook was sent successfully, False otherwise.
+        dict: The payload to send.
     """
-    logging.debug("Entered send_webhook function.")
     formatted_file_name = os.path.basename(file_name)  # Extract the file name
-    file_url = f"{base_audio_url}{formatted_file_name}"  # Construct the full URL
-    payload = {
+    file_url = f"{settings.base_audio_url}{formatted_file_name}"  # Construct the full URL
+    return {
         "payload": {
             "message": file_url,
             "title": topic,
@@ -223,117 +800,440 @@ def send_webhook(file_name, topic, retries=max_retries):
         }
     }
 
-    logging.info(f"Webhook payload: {payload}")
+# -----------------------------------------------------------------------------
+# Function: dead_letter_event
+# Description: Saves a tone event that was never sent to the dead-letter file.
+# -----------------------------------------------------------------------------
+def dead_letter_event(settings, file_name, topic):
+    """
+    Writes the webhook for a tone event to the dead-letter file for every URL.
 
-    attempt = 0
-    backoff_time = initial_backoff
+    Used by the daemon at shutdown for events it acknowledged but did not 
+    finish sending.
 
-    while attempt < retries:
-        try:
-            logging.info(f"Attempt {attempt + 1} to send webhook.")
-            response = requests.post(webhook_url, json=payload, timeout=timeout_seconds)
-            response.raise_for_status()  # Raise an HTTPError for bad responses
-            logging.info(f"Webhook sent successfully: {payload}")
-            logging.debug("Exiting send_webhook function after success.")
-            return True
-
-        except requests.exceptions.ConnectionError as conn_err:
-            logging.error(f"Attempt {attempt + 1}: Connection Error: {conn_err}")
-            if attempt < retries - 1:
-                logging.info("Retrying immediately due to connection error...")
-                sleep(1)
-            else:
-                logging.error("Max retries reached for connection error.")
-        
-        except requests.exceptions.Timeout as timeout_err:
-            logging.error(f"Attempt {attempt + 1}: Timeout Error: {timeout_err}")
-            if attempt < retries - 1:
-                logging.info(f"Retrying in {backoff_time} seconds due to timeout...")
-                sleep(backoff_time)
-                backoff_time *= backoff_multiplier
-        
-        except requests.exceptions.HTTPError as http_err:
-            logging.error(f"Attempt {attempt + 1}: HTTP Error: {http_err}")
-            if attempt < retries - 1:
-                logging.info(f"Retrying in {backoff_time} seconds due to HTTP error...")
-                sleep(backoff_time)
-                backoff_time *= backoff_multiplier
-        
-        except requests.exceptions.RequestException as req_err:
-            logging.error(f"Attempt {attempt + 1}: General Webhook Error: {req_err}")
-            if attempt < retries - 1:
-                logging.info(f"Retrying in {backoff_time} seconds due to general error...")
-                sleep(backoff_time)
-                backoff_time *= backoff_multiplier
-
-        attempt += 1
-
-    logging.error("Webhook failed after all retry attempts.")
-    logging.debug("Exiting send_webhook function after failure.")
-    return False
+    Args:
+        settings (Settings): The script settings.
+        file_name (str): The name of the audio file.
+        topic (str): The topic for the webhook and notification.
+    """
+    payload = build_webhook_payload(settings, file_name, topic)
+    for url in get_webhook_urls(settings):
+        append_dead_letter(settings, {"ts": time.time(), "url": url, "payload": payload})
+
+# -----------------------------------------------------------------------------
+# Function: send_webhook
+# Description: Sends a webhook to Node-RED, delivering to the primary and the 
+#              optional secondary URL concurrently.
+# -----------------------------------------------------------------------------
+async def send_webhook(session, settings, file_name, topic, retries=None, errors=None):
+    """
+    Sends a webhook to Node-RED with the audio file URL and relevant details.
+
+    The payload is delivered to the primary webhook URL and, when configured, 
+    to the secondary webhook URL at the same time, so the total time is bounded 
+    by the slower endpoint rather than the sum of both.
+
+    A circuit breaker guards the delivery. After breaker_threshold consecutive 
+    failed events, webhooks are skipped for breaker_cooldown seconds. The next 
+    event after the cooldown is sent normally and either closes the breaker on 
+    success or reopens it on failure.
+
+    Payloads that are skipped or reach no endpoint are written to the 
+    dead-letter file for each URL that may accept them later (see 
+    append_dead_letter()). URLs that rejected the payload with a client 
+    error are not saved, since a replay would be rejected again.
+
+    Args:
+        session (aiohttp.ClientSession): The shared session used for the requests.
+        settings (Settings): The script settings.
+        file_name (str): The name of the audio file to be included in the webhook.
+        topic (str): The topic for the webhook and notification.
+        retries (int, optional): Number of retry attempts for sending the webhook (default is max_retries).
+        errors (list, optional): Receives one line per endpoint that could not be reached.
+
+    Returns:
+        bool: True if the webhook reached at least one endpoint, False otherwise.
+    """
+    logging.debug("Entered send_webhook function.")
+    if retries is None:
+        retries = settings.max_retries
+
+    payload = build_webhook_payload(settings, file_name, topic)
+    urls = get_webhook_urls(settings)
+
+    # File writes and their locks run in the default executor, off the event loop
+    loop = asyncio.get_running_loop()
+    breaker_state = load_breaker_state(settings)
+    if breaker_is_open(breaker_state):
+        logging.warning("Circuit open after %s consecutive failures; skipping webhook.", breaker_state["failures"])
+        if errors is not None:
+            errors.append(f"Circuit breaker open after {breaker_state['failures']} consecutive failures; webhook skipped.")
+        for url in urls:
+            await loop.run_in_executor(None, append_dead_letter, settings, {"ts": time.time(), "url": url, "payload": payload})
+        return False
+
+    logging.info("Webhook payload: %s", payload)
+    # Encode once; every endpoint and every retry reuses the same bytes
+    body = json.dumps(payload, separators=(",", ":")).encode()
+
+    rejected = []
+    results = await asyncio.gather(
+        *(deliver_webhook(session, settings, url, body, retries, errors, rejected) for url in urls),
+        return_exceptions=True
+    )
+
+    delivered = False
+    for url, result in zip(urls, results):
+        if isinstance(result, Exception):
+            logging.error("Unexpected error while sending webhook to %s: %s", url, result)
+            if errors is not None:
+                errors.append(f"{url}: {type(result).__name__}: {result}")
+        elif result:
+            delivered = True
+
+    # A healthy endpoint with a closed breaker needs no write
+    if not delivered or breaker_state["failures"]:
+        await loop.run_in_executor(None, update_breaker_state, settings, delivered)
+
+    if not delivered:
+        for url in urls:
+            if url not in rejected:
+                await loop.run_in_executor(None, append_dead_letter, settings, {"ts": time.time(), "url": url, "payload": payload})
+
+    logging.debug("Exiting send_webhook function.")
+    return delivered
 
 # -----------------------------------------------------------------------------
 # Function: send_error_notification
 # Description: Sends a Pushover notification for errors encountered during the
 #              webhook process.
 # -----------------------------------------------------------------------------
-def send_error_notification(error_message):
+async def send_error_notification(session, settings, error_message):
     """
     Sends a Pushover notification for errors encountered during the webhook process.
 
     This function sends a Pushover notification with the specified error message. 
-    It is used when a webhook fails to send after the configured number of retries.
+    It is used when a webhook fails to send after the configured number of retries. 
+    Notifications are spaced at least _pushover_safe_interval seconds apart; 
+    alerts inside that window are suppressed and counted in the next one sent.
 
     Args:
+        session (aiohttp.ClientSession): The shared session used for the request.
+        settings (Settings): The script settings.
         error_message (str): The error message to be included in the Pushover notification.
 
     Returns:
         None
     """
+    import aiohttp  # Imported lazily; see create_session()
+    global _last_pushover_ts, _suppressed_pushover_count
     logging.debug("Entered send_error_notification function.")
+    now = time.monotonic()
+    if _last_pushover_ts is not None and now - _last_pushover_ts < _pushover_safe_interval:
+        _suppressed_pushover_count += 1
+        logging.warning("Pushover suppressed (sent less than %ss ago): %s", _pushover_safe_interval, error_message)
+        return
+    _last_pushover_ts = now
+
+    if _suppressed_pushover_count:
+        error_message += f"\n({_suppressed_pushover_count} earlier alert(s) suppressed.)"
+        _suppressed_pushover_count = 0
+
     pushover_url = "https://api.pushover.net/1/messages.json"
-    pushover_data = {
-        "token": pushover_app_token,
-        "user": pushover_user_key,
-        "message": error_message,
-        "priority": pushover_priority,
-        "retry": pushover_retry,
-        "expire": pushover_expire,
-        "sound": pushover_sound
-    }
+    pushover_data = {**settings.pushover_payload, "message": error_message}
     try:
-        response = requests.post(pushover_url, data=pushover_data)
-        response.raise_for_status()
+        # Bound the call so a slow Pushover API cannot stall the event or the daemon
+        pushover_timeout = aiohttp.ClientTimeout(total=settings.timeout_seconds, connect=2, sock_read=5)
+        async with session.post(pushover_url, data=pushover_data, timeout=pushover_timeout) as response:
+            response.raise_for_status()
         logging.info("Pushover notification sent successfully.")
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Failed to send Pushover notification: {e}")
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logging.error("Failed to send Pushover notification: %s", e)
     logging.debug("Exiting send_error_notification function.")
 
+# -----------------------------------------------------------------------------
+# Function: create_session
+# Description: Creates the shared aiohttp session with a pooled connector.
+# -----------------------------------------------------------------------------
+def create_session():
+    """
+    Creates an aiohttp session backed by a keep-alive connection pool.
+
+    Returns:
+        aiohttp.ClientSession: The session to use for webhook and Pushover requests.
+    """
+    # aiohttp is imported here rather than at module level: a run that hands its 
+    # event to the daemon exits without ever needing the HTTP client.
+    import aiohttp
+    connector = aiohttp.TCPConnector(
+        limit=connector_limit,
+        limit_per_host=connector_limit_per_host,
+        keepalive_timeout=connector_keepalive_timeout
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+# -----------------------------------------------------------------------------
+# Function: process_event
+# Description: Sends the webhook for one tone event and raises a Pushover alert 
+#              if no endpoint accepts it.
+# -----------------------------------------------------------------------------
+async def process_event(session, settings, file_name, topic, retries):
+    """
+    Sends the webhook for a single tone event.
+
+    If every endpoint fails, one summary Pushover notification is sent with the 
+    final error from each endpoint.
+
+    Args:
+        session (aiohttp.ClientSession): The shared session used for the requests.
+        settings (Settings): The script settings.
+        file_name (str): The name of the audio file.
+        topic (str): The topic for the webhook and notification.
+        retries (int): Number of retry attempts for sending the webhook.
+
+    Returns:
+        bool: True if the webhook reached at least one endpoint, False otherwise.
+    """
+    logging.info("Sending webhook for file: %s with topic: %s", file_name, topic)
+    errors = []
+    if await send_webhook(session, settings, file_name, topic, retries, errors):
+        return True
+
+    logging.error("Failed to send webhook to any endpoint.")
+    # One summary notification per event, listing the final error for each endpoint
+    summary = "\n".join(
+        [f"Failed to send webhook for {os.path.basename(file_name)} ({topic})."] + errors
+    )
+    await send_error_notification(session, settings, summary[:1024])  # Pushover message limit
+    return False
+
+# -----------------------------------------------------------------------------
+# Function: submit_to_daemon
+# Description: Hands a tone event to a running pre-notification daemon.
+# -----------------------------------------------------------------------------
+async def submit_to_daemon(settings, file_name, topic, retries):
+    """
+    Sends the event to the daemon as a single JSON line over a local TCP socket.
+
+    The event only counts as handed over once the daemon answers with 
+    DAEMON_ACK, which it sends after queueing the event. A listener that 
+    closes the connection, answers with anything else (e.g. another service 
+    on the same port) or stays silent for daemon_ack_timeout seconds is 
+    treated as no daemon, so the caller sends the webhook in-process.
+
+    Args:
+        settings (Settings): The script settings.
+        file_name (str): The name of the audio file.
+        topic (str): The topic for the webhook and notification.
+        retries (int): Number of retry attempts for sending the webhook.
+
+    Returns:
+        bool: True if the daemon acknowledged the event, False otherwise.
+    """
+    event = {"file_name": file_name, "topic": topic, "retries": retries}
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(settings.daemon_host, settings.daemon_port), timeout=1)
+    except (OSError, asyncio.TimeoutError):
+        logging.debug("No daemon listening on %s:%s.", settings.daemon_host, settings.daemon_port)
+        return False
+
+    try:
+        writer.write(json.dumps(event, separators=(",", ":")).encode() + b"\n")
+        await writer.drain()
+        ack = await asyncio.wait_for(reader.readline(), timeout=daemon_ack_timeout)
+    except (OSError, ValueError, asyncio.TimeoutError) as e:
+        logging.warning("Failed to hand event to daemon: %r", e)
+        return False
+    finally:
+        writer.close()
+
+    if ack != DAEMON_ACK:
+        logging.warning("Listener on %s:%s did not acknowledge the event (got %r).", settings.daemon_host, settings.daemon_port, ack[:64])
+        return False
+    logging.info("Event handed to daemon on %s:%s: %s", settings.daemon_host, settings.daemon_port, event)
+    return True
+
+# -----------------------------------------------------------------------------
+# Function: run_daemon
+# Description: Runs a long-lived server that batches incoming tone events and 
+#              dispatches each batch concurrently over one shared session.
+# -----------------------------------------------------------------------------
+async def run_daemon(settings):
+    """
+    Accepts tone events on a local TCP socket and dispatches them in batches.
+
+    Each client connection carries one JSON line with file_name, topic and 
+    retries, and is answered with DAEMON_ACK once the event is queued. Events 
+    that arrive within batch_window of the first queued event are dispatched 
+    together, so bursts of tone detections share one process, one parsed 
+    config and one pool of warm connections. Batches run in the background so 
+    a slow retry never delays the next batch.
+
+    The dead-letter file is replayed at startup and after every batch that 
+    reached an endpoint (see drain_dead_letters()).
+
+    SIGINT and SIGTERM stop the daemon without losing acknowledged events. 
+    The server stops accepting connections, events still queued are written 
+    to the dead-letter file, and events being sent get daemon_shutdown_grace 
+    seconds to finish before they are cancelled and dead-lettered too.
+
+    Args:
+        settings (Settings): The script settings.
+    """
+    logging.debug("Entered run_daemon function.")
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    pending_batches = set()
+    # Each event being sent, mapped to the task sending it
+    in_flight = {}
+
+    async def handle_client(reader, writer):
+        try:
+            line = await reader.readline()
+            event = json.loads(line)
+            queue.put_nowait((event['file_name'], event['topic'], int(event.get('retries', settings.max_retries))))
+            # Acknowledge only once the event is queued; see submit_to_daemon()
+            writer.write(DAEMON_ACK)
+            await writer.drain()
+        except (ValueError, KeyError, TypeError) as e:
+            logging.error("Discarding malformed daemon event: %s", e)
+        except OSError as e:
+            logging.warning("Failed to acknowledge daemon event: %s", e)
+        finally:
+            writer.close()
+
+    def finish(task):
+        file_name, topic, _ = in_flight.pop(task)
+        if not task.cancelled() and task.exception() is not None:
+            logging.error("Unexpected error while processing %s (%s): %s", file_name, topic, task.exception(), exc_info=task.exception())
+
+    def dispatch(session, batch):
+        # Event tasks are registered before this returns, so shutdown always 
+        # finds every acknowledged event either on the queue or in flight
+        tasks = []
+        for event in batch:
+            task = asyncio.ensure_future(process_event(session, settings, *event))
+            in_flight[task] = event
+            task.add_done_callback(finish)
+            tasks.append(task)
+        track(asyncio.ensure_future(collect(session, tasks)))
+
+    async def collect(session, tasks):
+        # Errors are logged per event by finish()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # An endpoint is reachable again; replay anything saved while it was down
+        if any(result is True for result in results):
+            await drain_dead_letters(session, settings)
+
+    def track(task):
+        pending_batches.add(task)
+        task.add_done_callback(pending_batches.discard)
+
+    async def shutdown(server):
+        server.close()
+        await server.wait_closed()
+        queued = []
+        while not queue.empty():
+            event = queue.get_nowait()
+            if event is not None:
+                queued.append(event)
+        if in_flight:
+            logging.info("Waiting up to %s seconds for %s event(s) in flight.", daemon_shutdown_grace, len(in_flight))
+            await asyncio.wait(list(in_flight), timeout=daemon_shutdown_grace)
+        unfinished = list(in_flight.items())
+        for task, _ in unfinished:
+            task.cancel()
+        for task in list(pending_batches):
+            task.cancel()
+        await asyncio.gather(*(task for task, _ in unfinished), *pending_batches, return_exceptions=True)
+
+        unsent = queued + [event for _, event in unfinished]
+        if unsent:
+            logging.warning("Saving %s unsent event(s) to the dead-letter file before exiting.", len(unsent))
+        for file_name, topic, _ in unsent:
+            await loop.run_in_executor(None, dead_letter_event, settings, file_name, topic)
+        logging.info("Daemon stopped.")
+
+    # A None on the queue asks the batching loop to stop. Signal handlers are 
+    # not available on Windows, where Ctrl+C cancels the loop instead.
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signal_number, queue.put_nowait, None)
+        except NotImplementedError:
+            pass
+
+    async with create_session() as session:
+        track(asyncio.ensure_future(drain_dead_letters(session, settings)))
+        server = await asyncio.start_server(handle_client, settings.daemon_host, settings.daemon_port)
+        logging.info("Daemon listening on %s:%s with a %.0fms batch window.", settings.daemon_host, settings.daemon_port, settings.batch_window * 1000)
+        try:
+            stopping = False
+            while not stopping:
+                event = await queue.get()
+                if event is None:
+                    break
+                batch = [event]
+                deadline = loop.time() + settings.batch_window
+                while (remaining := deadline - loop.time()) > 0:
+                    try:
+                        event = await asyncio.wait_for(queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    if event is None:
+                        stopping = True
+                        break
+                    batch.append(event)
+
+                logging.info("Dispatching batch of %s event(s).", len(batch))
+                dispatch(session, batch)
+        finally:
+            logging.info("Daemon shutting down.")
+            await shutdown(server)
+
 # -----------------------------------------------------------------------------
 # Main Execution
 # -----------------------------------------------------------------------------
-def main():
+async def main():
     """
     Main function to parse arguments and initiate the webhook process.
 
     This function parses command-line arguments to extract the audio file name 
-    and topic, then calls send_webhook() to send the information to Node-RED.
+    and topic. With --daemon it starts the batching server instead, and with 
+    --drain it replays the dead-letter file and exits. Otherwise 
+    the event is handed to a running daemon when one is listening, and sent 
+    in-process with send_webhook() when not. If no endpoint accepts the 
+    webhook, a Pushover error notification is sent over the same session.
     """
+    settings = configure()
     logging.debug("Entered main function.")
     parser = argparse.ArgumentParser(description="Send a webhook to Node-RED with audio file details.")
-    parser.add_argument('file_name', help="The name of the audio file.")
-    parser.add_argument('topic', help="The topic for the webhook and notification.")
-    parser.add_argument('--retries', type=int, default=max_retries, help="Number of retry attempts for sending the webhook.")
+    parser.add_argument('file_name', nargs='?', help="The name of the audio file.")
+    parser.add_argument('topic', nargs='?', help="The topic for the webhook and notification.")
+    parser.add_argument('--retries', type=int, default=settings.max_retries, help="Number of retry attempts for sending the webhook.")
+    parser.add_argument('--daemon', action='store_true', help="Run as a long-lived daemon that batches incoming events.")
+    parser.add_argument('--drain', action='store_true', help="Replay the dead-letter file and exit.")
     
     args = parser.parse_args()
 
-    logging.info(f"Received arguments: {args}")
-    logging.info(f"Sending webhook for file: {args.file_name} with topic: {args.topic}")
+    logging.info("Received arguments: %s", args)
+
+    if args.daemon:
+        await run_daemon(settings)
+        return
+
+    if args.drain:
+        async with create_session() as session:
+            await drain_dead_letters(session, settings)
+        return
+
+    if args.file_name is None or args.topic is None:
+        parser.error("file_name and topic are required unless --daemon or --drain is given.")
 
-    if not send_webhook(args.file_name, args.topic, args.retries):
-        logging.error("Failed to send webhook after multiple attempts.")
+    if not await submit_to_daemon(settings, args.file_name, args.topic, args.retries):
+        async with create_session() as session:
+            await process_event(session, settings, args.file_name, args.topic, args.retries)
 
     logging.debug("Exiting main function.")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -3,15 +3,67 @@
 
 """
 Script Name: ttd_transcribed.py
-Version: v3.0.5
+Version: v3.2.0
 Author: Quentin King
 Creation Date: 09-07-2023
-Last Updated: 10-05-2024
+Last Updated: 10-16-2026
 Description:
-Transcribes audio files using Whisper AI, sends webhook to Node-RED, and includes
+Transcribes audio files using faster-whisper, sends webhook to Node-RED, and includes
 log cleanup, persistent state, and comprehensive logging with Pushover notifications.
 
 Changelog:
+v3.2.0 - 10-16-2026
+- Switched from openai-whisper to faster-whisper (CTranslate2) with INT8 weights:
+  int8_float16 on the GPU, int8 on the CPU. PyTorch is no longer required, so the
+  FP16 weight conversion, the optional compile_encoder setting, the
+  inference_mode/cuDNN settings and the PyTorch allocator metrics were removed.
+- Speech chunks within a file are transcribed in batches of batch_size
+  (default 8) with faster-whisper's BatchedInferencePipeline; 1 disables it.
+- Transcripts are streamed to disk segment by segment and renamed into place
+  when complete.
+- Log cleanup and deleting processed files run in worker threads instead of at
+  import time / on the event loop.
+- In --serve mode, SIGHUP reloads ttd_transcribed_config.json.
+- Transcriptions run on a dedicated single-thread executor instead of the
+  default one.
+- New --serve mode keeps the model loaded and accepts jobs over HTTP
+  (POST /transcribe); ttd_transcribed_client.py submits them. Notifications are
+  flushed every notification_interval seconds.
+- The model is loaded on first use, so a run whose transcripts are all current
+  skips loading it; --serve loads it before accepting jobs.
+- Optional compute_type setting overrides the CTranslate2 precision (for example
+  float16 or int8_float32).
+- On the CPU, inference uses one thread per core by default (cpu_threads).
+- Silent stretches are removed with faster-whisper's Silero VAD filter before
+  transcription (vad_filter, vad_min_silence_duration_ms).
+- The 'verbose' Whisper option is no longer used; 'logprob_threshold' is passed
+  as faster-whisper's log_prob_threshold.
+
+v3.1.0 - 10-16-2026
+- Accept several MP3 file / department pairs per run; the audio for every file is
+  decoded up front and each mel spectrogram is computed on the model's device.
+- Files are processed concurrently: transcriptions run one at a time in a worker
+  thread while webhooks and notifications for finished files keep going. The task
+  summary Pushover notification is sent once per run.
+- Task summaries and errors are combined into one Pushover message per run.
+- The compute device and the NVML GPU handle are resolved once at startup.
+- Decoding runs under torch.inference_mode(); on the GPU, cuDNN autotuning and
+  TF32 matmuls are enabled.
+- An MP3 file whose transcript is newer than the file is not transcribed again;
+  its saved transcript is sent instead. Use --force to transcribe anyway.
+- The static Pushover payload (credentials, default priority and sound) is built
+  once at startup.
+- The config file, JSON log records and webhook payloads are handled by orjson
+  when it is installed.
+- GPU memory cached by PyTorch is released once at shutdown, not per file.
+- Logger calls use %-style arguments, so filtered-out messages are never formatted.
+- Transcription time is measured with the monotonic time.perf_counter().
+- Optional compile_encoder setting compiles the Whisper encoder with
+  torch.compile at startup (GPU, PyTorch 2.0+).
+- GPU inference runs in FP16 with FP16 Linear/Conv1d weights.
+- Log records are queued and written by a QueueListener thread, so JSON
+  formatting and file I/O no longer block the event loop.
+
 v3.0.5 - 10-05-2024
 - Added GPU usage measurement using pynvml.
 - Fixed duplicate "Transcription Task Summary" headers in Pushover notifications.
@@ -58,18 +110,29 @@ v3.0.0 - 10-05-2024
 
 import os
 import sys
+import time
+import heapq
 import logging
 import logging.config
+import logging.handlers
+import queue
+import threading
+import atexit
 import json
 import argparse
-from datetime import datetime, timedelta
-from typing import Any, Dict, Optional, List
+from concurrent.futures import ThreadPoolExecutor
+import functools
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+from datetime import datetime
+from typing import Any, Dict, Optional, List, Mapping, Tuple
 import asyncio
 import aiohttp
-import aiofiles
-import whisper
+from aiohttp import web
+import ctranslate2
+import numpy as np
+from faster_whisper import BatchedInferencePipeline, WhisperModel, decode_audio
 import psutil
-import torch
 from dotenv import load_dotenv
 import signal
 from pythonjsonlogger import jsonlogger
@@ -81,6 +144,12 @@ try:
 except ImportError:
     GPU_AVAILABLE = False
 
+# Import orjson for faster config parsing and JSON log records; falls back to json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # -----------------------------------------------------------------------------
 # Load Environment Variables
 # -----------------------------------------------------------------------------
@@ -95,8 +164,27 @@ config_path = os.path.join(script_dir, 'ttd_transcribed_config.json')
 # -----------------------------------------------------------------------------
 # Load Configuration
 # -----------------------------------------------------------------------------
-with open(config_path, 'r') as f:
-    config = json.load(f)
+@functools.lru_cache(maxsize=1)
+def load_config(path: str = config_path) -> Dict[str, Any]:
+    """
+    Reads and parses the JSON configuration file once.
+
+    Later calls return the parsed dict from the cache; reload_settings clears
+    it to pick up an edited file.
+
+    Args:
+        path (str, optional): The configuration file path.
+
+    Returns:
+        Dict[str, Any]: The parsed configuration.
+    """
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+config = load_config()
 
 # -----------------------------------------------------------------------------
 # Validate Configuration
@@ -116,6 +204,117 @@ def validate_config(config: Dict[str, Any]) -> None:
 
 validate_config(config)
 
+# -----------------------------------------------------------------------------
+# Settings
+# -----------------------------------------------------------------------------
+# Config keys passed straight through to model.transcribe(), mapped to the
+# faster-whisper parameter names
+WHISPER_OPTION_KEYS = {
+    'temperature': 'temperature',
+    'language': 'language',
+    'beam_size': 'beam_size',
+    'best_of': 'best_of',
+    'no_speech_threshold': 'no_speech_threshold',
+    'compression_ratio_threshold': 'compression_ratio_threshold',
+    'logprob_threshold': 'log_prob_threshold',
+    'condition_on_previous_text': 'condition_on_previous_text',
+    'task': 'task',
+}
+
+@dataclass(frozen=True)
+class Settings:
+    """Read-only view of ttd_transcribed_config.json, flattened once at startup."""
+    # Logging
+    log_dir: str
+    log_level: str
+    log_to_console: bool
+    console_log_level: str
+    delete_after_processing: bool
+    transcript_dir: str
+    # Log cleanup
+    cleanup_enabled: bool
+    retention_strategy: str
+    retention_days: Optional[int]
+    max_log_files: Optional[int]
+    # Audio
+    base_path: str
+    # Pushover: the static part of every request; title and message vary per call
+    pushover_payload: Dict[str, Any]
+    # Webhook
+    webhook_url: str
+    base_audio_url: str
+    timeout_seconds: float
+    retry_limit: int
+    retry_delay: float
+    # Whisper
+    model_size: str
+    compute_type: Optional[str]
+    cpu_threads: int
+    batch_size: int
+    vad_filter: bool
+    vad_parameters: Dict[str, Any]
+    initial_prompts: Mapping[str, str]
+    whisper_kwargs: Dict[str, Any]
+    # Daemon mode (--serve)
+    server_host: str
+    server_port: int
+    notification_interval: float
+
+def load_settings(config: Dict[str, Any]) -> Settings:
+    """
+    Flattens the validated configuration into a Settings instance.
+
+    Args:
+        config (Dict[str, Any]): The parsed ttd_transcribed_config.json.
+
+    Returns:
+        Settings: The settings for this process.
+    """
+    logging_config = config['ttd_transcribed_Logging']
+    cleanup_config = config['ttd_transcribed_LogCleanup']
+    webhook_config = config['ttd_transcribed_Webhook']
+    whisper_config = config['ttd_transcribed_Whisper']
+    server_config = config.get('ttd_transcribed_Server', {})
+    log_dir = os.path.join(script_dir, logging_config['log_dir'])
+    return Settings(
+        log_dir=log_dir,
+        log_level=logging_config['log_level'],
+        log_to_console=logging_config['log_to_console'],
+        console_log_level=logging_config['console_log_level'],
+        delete_after_processing=logging_config['delete_after_processing'],
+        transcript_dir=os.path.join(log_dir, "transcripts"),
+        cleanup_enabled=cleanup_config['cleanup_enabled'],
+        retention_strategy=cleanup_config['retention_strategy'],
+        retention_days=cleanup_config.get('retention_days', 7),
+        max_log_files=cleanup_config.get('max_log_files', 10),
+        base_path=config['ttd_transcribed_audio_Path']['base_path'],
+        # Credentials come from environment variables
+        pushover_payload={
+            "token": os.getenv('PUSHOVER_TOKEN'),
+            "user": os.getenv('PUSHOVER_USER'),
+            "priority": config['ttd_transcribed_Pushover'].get('priority', 0),
+            "sound": config['ttd_transcribed_Pushover'].get('sound', 'pushover'),
+        },
+        webhook_url=webhook_config['ttd_transcribed_url'],
+        base_audio_url=webhook_config['base_audio_url'],
+        timeout_seconds=webhook_config.get('timeout_seconds', 10),
+        retry_limit=webhook_config.get('retry_limit', 3),
+        retry_delay=webhook_config.get('retry_delay', 5),
+        model_size=whisper_config['model_size'],
+        compute_type=whisper_config.get('compute_type'),
+        cpu_threads=whisper_config.get('cpu_threads', 0),
+        batch_size=whisper_config.get('batch_size', 8),
+        vad_filter=whisper_config.get('vad_filter', True),
+        vad_parameters={'min_silence_duration_ms': whisper_config.get('vad_min_silence_duration_ms', 500)},
+        initial_prompts=MappingProxyType(dict(whisper_config['initial_prompts'])),
+        whisper_kwargs={option: whisper_config[key] for key, option in WHISPER_OPTION_KEYS.items()},
+        server_host=server_config.get('host', '127.0.0.1'),
+        server_port=server_config.get('port', 8766),
+        notification_interval=server_config.get('notification_interval', 60)
+    )
+
+settings = load_settings(config)
+
 # -----------------------------------------------------------------------------
 # Initialize Notification Lists
 # -----------------------------------------------------------------------------
@@ -125,14 +324,21 @@ error_notifications: List[str] = []
 # -----------------------------------------------------------------------------
 # Logging Configuration
 # -----------------------------------------------------------------------------
+class OrjsonFormatter(jsonlogger.JsonFormatter):
+    """JsonFormatter that serializes each record with orjson instead of json.dumps."""
+
+    def jsonify_log_record(self, log_record: Dict[str, Any]) -> str:
+        # default=str matches the formatter's fallback for values JSON can't represent
+        return orjson.dumps(log_record, default=str).decode()
+
 def setup_logging() -> logging.Logger:
     """
     Sets up the logging configuration with JSON formatting and log rotation.
     """
-    log_dir = os.path.join(script_dir, config['ttd_transcribed_Logging']['log_dir'])
-    log_level = config['ttd_transcribed_Logging']['log_level']
-    log_to_console = config['ttd_transcribed_Logging']['log_to_console']
-    console_log_level = config['ttd_transcribed_Logging']['console_log_level']
+    log_dir = settings.log_dir
+    log_level = settings.log_level
+    log_to_console = settings.log_to_console
+    console_log_level = settings.console_log_level
     
     os.makedirs(log_dir, exist_ok=True)
 
@@ -143,7 +349,7 @@ def setup_logging() -> logging.Logger:
         'disable_existing_loggers': False,
         'formatters': {
             'json': {
-                '()': 'pythonjsonlogger.jsonlogger.JsonFormatter',
+                '()': OrjsonFormatter if orjson is not None else 'pythonjsonlogger.jsonlogger.JsonFormatter',
                 'format': '%(asctime)s %(levelname)s %(name)s %(funcName)s %(lineno)d %(message)s',
                 'rename_fields': {
                     'asctime': 'timestamp',
@@ -152,7 +358,6 @@ def setup_logging() -> logging.Logger:
                     'funcName': 'function',
                     'lineno': 'line_no',
                 },
-                'json_indent': 4
             },
             'standard': {
                 'format': '%(asctime)s - %(levelname)s - %(name)s - %(funcName)s - %(lineno)d - %(message)s'
@@ -186,22 +391,40 @@ def setup_logging() -> logging.Logger:
 
     logging.config.dictConfig(logging_config)
     logger = logging.getLogger('ttd_transcribed')
+
+    # Move the configured handlers behind a queue: callers only enqueue the record,
+    # and a listener thread does the JSON formatting and file writes. The listener
+    # is stopped at exit (including sys.exit from shutdown_handler), which drains
+    # the queue first.
+    global _LOG_LISTENER
+    log_queue = queue.Queue(-1)
+    _LOG_LISTENER = logging.handlers.QueueListener(log_queue, *logger.handlers, respect_handler_level=True)
+    logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+    _LOG_LISTENER.start()
+    atexit.register(_LOG_LISTENER.stop)
+
     logger.info("Logging initialized.", extra={'unique_id': 'N/A'})
-    logger.info(f"Logs will be stored in: {log_dir}", extra={'unique_id': 'N/A'})
-    logger.info(f"Log file: {log_file_path}", extra={'unique_id': 'N/A'})
+    logger.info("Logs will be stored in: %s", log_dir, extra={'unique_id': 'N/A'})
+    logger.info("Log file: %s", log_file_path, extra={'unique_id': 'N/A'})
     return logger
 
+_LOG_LISTENER: Optional[logging.handlers.QueueListener] = None
 logger = setup_logging()
 
 # -----------------------------------------------------------------------------
 # Initialize pynvml for GPU Monitoring
 # -----------------------------------------------------------------------------
+# NVML handle for the first GPU, acquired once and reused by log_system_usage
+_NVML_HANDLE = None
+
 if GPU_AVAILABLE:
     try:
         pynvml.nvmlInit()
+        # Assuming single GPU; modify if multiple GPUs are used
+        _NVML_HANDLE = pynvml.nvmlDeviceGetHandleByIndex(0)
         logger.info("NVIDIA Management Library (pynvml) initialized for GPU monitoring.", extra={'unique_id': 'N/A'})
     except pynvml.NVMLError as e:
-        logger.error(f"Failed to initialize pynvml for GPU monitoring: {e}", extra={'unique_id': 'N/A'})
+        logger.error("Failed to initialize pynvml for GPU monitoring: %s", e, extra={'unique_id': 'N/A'})
         GPU_AVAILABLE = False
 else:
     logger.warning("pynvml is not installed. GPU usage will not be monitored.", extra={'unique_id': 'N/A'})
@@ -234,17 +457,118 @@ def log_error(message: str, unique_id: str) -> None:
 # -----------------------------------------------------------------------------
 # Load Whisper Model with GPU Utilization
 # -----------------------------------------------------------------------------
-def load_whisper_model() -> whisper.Whisper:
+# Resolved once; CTranslate2 reports the CUDA devices it can use
+_DEVICE = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+
+def load_whisper_model() -> WhisperModel:
+    """
+    Loads the faster-whisper model, utilizing GPU if available.
+
+    Unless compute_type is configured, CTranslate2 stores the weights in INT8
+    and runs its quantized matmul kernels: on the GPU activations stay FP16
+    (int8_float16), on the CPU the whole model runs in INT8.
+
+    On the CPU the INT8 matmuls use one thread per core unless cpu_threads is
+    set; CTranslate2's own default is 4 threads regardless of the machine.
+    """
+    model_size = settings.model_size
+    compute_type = settings.compute_type or ("int8_float16" if _DEVICE == "cuda" else "int8")
+    cpu_threads = settings.cpu_threads or (os.cpu_count() if _DEVICE == "cpu" else 0) or 0
+    logger.info(
+        "Loading Whisper model '%s' on device '%s' (%s).", model_size, _DEVICE, compute_type,
+        extra={'unique_id': 'N/A'}
+    )
+    return WhisperModel(
+        model_size, device=_DEVICE, compute_type=compute_type, cpu_threads=cpu_threads, num_workers=1
+    )
+
+# Guards the first load, so a warm-up and a job arriving together load it once
+_MODEL_LOAD_LOCK = threading.Lock()
+
+@functools.lru_cache(maxsize=1)
+def _load_transcriber() -> Any:
+    model = load_whisper_model()
+    # With batch_size > 1, the speech chunks of a file go through the encoder and
+    # decoder batch_size at a time instead of one by one
+    return BatchedInferencePipeline(model=model) if settings.batch_size > 1 else model
+
+def get_transcriber() -> Any:
+    """
+    Returns the process-wide model, loading it on first use.
+
+    Loading lazily means a run whose transcripts are all current never reads
+    the weights at all; afterwards every call returns the same instance.
+
+    Returns:
+        WhisperModel or BatchedInferencePipeline: The object to call transcribe() on.
+    """
+    with _MODEL_LOAD_LOCK:
+        return _load_transcriber()
+
+def build_transcribe_kwargs(settings: Settings) -> Dict[str, Any]:
+    """
+    Builds the options passed to the model's transcribe() for every file.
+
+    Everything except the audio and the department's initial prompt is fixed,
+    so the dict is built once per settings instead of once per call. Batched
+    chunks are decoded independently, so condition_on_previous_text does not
+    apply and is dropped in batched mode.
+
+    Args:
+        settings (Settings): The current settings.
+
+    Returns:
+        Dict[str, Any]: The transcribe() keyword arguments.
+    """
+    transcribe_kwargs = dict(settings.whisper_kwargs)
+    # Silero VAD drops silence and squelch tails before the encoder sees them
+    transcribe_kwargs['vad_filter'] = settings.vad_filter
+    transcribe_kwargs['vad_parameters'] = settings.vad_parameters
+    if settings.batch_size > 1:
+        transcribe_kwargs.pop('condition_on_previous_text', None)
+        transcribe_kwargs['batch_size'] = settings.batch_size
+    return transcribe_kwargs
+
+transcribe_kwargs = build_transcribe_kwargs(settings)
+
+# -----------------------------------------------------------------------------
+# Function: reload_settings
+# -----------------------------------------------------------------------------
+def reload_settings() -> None:
     """
-    Loads the Whisper model, utilizing GPU if available.
+    Re-reads the configuration file and swaps in the new settings (SIGHUP in --serve mode).
+
+    Everything read per file takes effect for the next job: webhook, Pushover,
+    Whisper options, prompts, VAD and log cleanup. model_size, compute_type,
+    cpu_threads and batch_size are fixed by the loaded model and keep their
+    values until a restart. An
+    invalid file is logged and the current settings are kept.
     """
-    model_size = config['ttd_transcribed_Whisper']['model_size']
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    logger.info(f"Loading Whisper model '{model_size}' on device '{device}'.", extra={'unique_id': 'N/A'})
-    model = whisper.load_model(model_size, device=device)
-    return model
+    global config, settings, transcribe_kwargs
 
-model = load_whisper_model()
+    load_config.cache_clear()
+    try:
+        new_config = load_config()
+        validate_config(new_config)
+        new_settings = load_settings(new_config)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.error("Failed to reload configuration, keeping current settings: %s", e, extra={'unique_id': 'N/A'})
+        return
+
+    fixed = ('model_size', 'compute_type', 'cpu_threads', 'batch_size')
+    if any(getattr(new_settings, name) != getattr(settings, name) for name in fixed):
+        logger.warning("%s changes take effect after a restart.", ", ".join(fixed), extra={'unique_id': 'N/A'})
+        new_settings = replace(new_settings, **{name: getattr(settings, name) for name in fixed})
+
+    # Rebinding the globals is atomic; jobs already running keep the old objects
+    config, settings = new_config, new_settings
+    transcribe_kwargs = build_transcribe_kwargs(settings)
+    logger.info("Configuration reloaded from %s", config_path, extra={'unique_id': 'N/A'})
+
+# The one thread that runs the model. Concurrent process_file calls queue here
+# for the GPU one at a time, and a long transcription never occupies a slot in
+# the default executor that decoding and file I/O use.
+_INFERENCE_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper")
 
 # -----------------------------------------------------------------------------
 # Log Cleanup Functionality
@@ -253,79 +577,81 @@ def cleanup_logs() -> None:
     """
     Cleans up old log files based on time-based or count-based retention strategy.
     """
-    log_dir = os.path.join(script_dir, config['ttd_transcribed_Logging']['log_dir'])
-    cleanup_enabled = config['ttd_transcribed_LogCleanup']['cleanup_enabled']
-    retention_strategy = config['ttd_transcribed_LogCleanup']['retention_strategy']
-    retention_days = config['ttd_transcribed_LogCleanup'].get('retention_days', 7)
-    max_log_files = config['ttd_transcribed_LogCleanup'].get('max_log_files', 10)
+    log_dir = settings.log_dir
+    cleanup_enabled = settings.cleanup_enabled
+    retention_strategy = settings.retention_strategy
+    retention_days = settings.retention_days
+    max_log_files = settings.max_log_files
 
     if not cleanup_enabled:
         logger.info("Log cleanup is disabled.", extra={'unique_id': 'N/A'})
         return
 
     try:
+        # One stat per rotated log (ttd_transcribed.log.<date>); the active log is never removed
+        active_log = os.path.join(log_dir, 'ttd_transcribed.log')
         with os.scandir(log_dir) as entries:
-            log_files = sorted(
-                [entry for entry in entries if entry.is_file() and entry.name.startswith("ttd_transcribed_")],
-                key=lambda e: e.stat().st_mtime
-            )
-
-            # Time-based log cleanup
-            if retention_strategy == 'time' and retention_days is not None:
-                now = datetime.now()
-                cutoff_time = now - timedelta(days=retention_days)
-
-                for entry in log_files:
-                    file_mod_time = datetime.fromtimestamp(entry.stat().st_mtime)
-                    if file_mod_time < cutoff_time:
-                        try:
-                            os.remove(entry.path)
-                            log_task(f"Deleted old log file: {entry.path}", unique_id='N/A')
-                        except Exception as e:
-                            log_error(f"Error deleting log file {entry.path}: {e}", unique_id='N/A')
-
-            # Count-based log cleanup
-            elif retention_strategy == 'count' and max_log_files is not None:
-                if len(log_files) > max_log_files:
-                    logs_to_delete = log_files[:-max_log_files]
-                    for entry in logs_to_delete:
-                        try:
-                            os.remove(entry.path)
-                            log_task(f"Deleted excess log file: {entry.path}", unique_id='N/A')
-                        except Exception as e:
-                            log_error(f"Error deleting log file {entry.path}: {e}", unique_id='N/A')
-            else:
-                log_error(f"Unknown retention strategy: {retention_strategy}", unique_id='N/A')
+            log_files = [
+                (entry.stat().st_mtime, entry.path)
+                for entry in entries
+                if entry.name.startswith('ttd_transcribed.log') and entry.path != active_log and entry.is_file()
+            ]
+
+        # Time-based log cleanup
+        if retention_strategy == 'time' and retention_days is not None:
+            cutoff = time.time() - retention_days * 86400
+            expired = [path for mtime, path in log_files if mtime < cutoff]
+            reason = "old"
+
+        # Count-based log cleanup: select only the oldest extras instead of sorting everything
+        elif retention_strategy == 'count' and max_log_files is not None:
+            excess_count = len(log_files) - max_log_files
+            expired = [path for _, path in heapq.nsmallest(excess_count, log_files)] if excess_count > 0 else []
+            reason = "excess"
+        else:
+            log_error(f"Unknown retention strategy: {retention_strategy}", unique_id='N/A')
+            return
+
+        # Delete first, then report once, instead of a log record and summary line per file
+        deleted = []
+        for path in expired:
+            try:
+                os.remove(path)
+                deleted.append(os.path.basename(path))
+            except Exception as e:
+                log_error(f"Error deleting log file {path}: {e}", unique_id='N/A')
+        if deleted:
+            log_task(f"Deleted {len(deleted)} {reason} log file(s) from {log_dir}: {', '.join(deleted)}", unique_id='N/A')
     except Exception as e:
         log_error(f"Error during log cleanup: {e}", unique_id='N/A')
 
-cleanup_logs()
-
 # -----------------------------------------------------------------------------
 # Performance Monitoring: Log CPU, GPU, and Memory Usage
 # -----------------------------------------------------------------------------
-# Initialize CPU percent measurement
-psutil.cpu_percent(interval=None)
+# One Process handle for the life of the script. cpu_percent(None) never blocks;
+# it reports usage since the previous call, so this first call primes it and the
+# reading taken after a transcription covers exactly that transcription.
+_PROC = psutil.Process(os.getpid())
+_PROC.cpu_percent(interval=None)
 
 def log_system_usage(unique_id: str) -> None:
     """
     Logs the current memory, CPU, and GPU usage of the script.
+
+    CPU usage is the average since the previous reading.
     
     Args:
         unique_id (str): The unique identifier for the task.
     """
-    process = psutil.Process(os.getpid())
-    memory_info = process.memory_info()
-    cpu_usage = process.cpu_percent(interval=1.5)  # Increased interval for accurate measurement
+    memory_info = _PROC.memory_info()
+    cpu_usage = _PROC.cpu_percent(interval=None)
 
     usage_message = f"Memory usage: {memory_info.rss / (1024 * 1024):.2f} MB, CPU usage: {cpu_usage:.2f}%"
 
     if GPU_AVAILABLE:
         try:
-            # Assuming single GPU; modify if multiple GPUs are used
-            handle = pynvml.nvmlDeviceGetHandleByIndex(0)
-            gpu_util = pynvml.nvmlDeviceGetUtilizationRates(handle).gpu
-            gpu_memory = pynvml.nvmlDeviceGetMemoryInfo(handle).used / (1024 * 1024)  # in MB
+            gpu_util = pynvml.nvmlDeviceGetUtilizationRates(_NVML_HANDLE).gpu
+            gpu_memory = pynvml.nvmlDeviceGetMemoryInfo(_NVML_HANDLE).used / (1024 * 1024)  # in MB
             usage_message += f", GPU usage: {gpu_util}% | GPU Memory Usage: {gpu_memory:.2f} MB"
         except pynvml.NVMLError as e:
             usage_message += f", GPU usage: Error retrieving GPU metrics ({e})"
@@ -339,18 +665,37 @@ def shutdown_handler(signum, frame):
     """
     Handles shutdown signals to allow graceful shutdown.
     """
-    logger.info(f"Received shutdown signal ({signum}). Shutting down gracefully...", extra={'unique_id': 'N/A'})
+    logger.info("Received shutdown signal (%s). Shutting down gracefully...", signum, extra={'unique_id': 'N/A'})
     if GPU_AVAILABLE:
         try:
             pynvml.nvmlShutdown()
             logger.info("pynvml shutdown successfully.", extra={'unique_id': 'N/A'})
         except pynvml.NVMLError as e:
-            logger.error(f"Error shutting down pynvml: {e}", extra={'unique_id': 'N/A'})
+            logger.error("Error shutting down pynvml: %s", e, extra={'unique_id': 'N/A'})
     sys.exit(0)
 
 signal.signal(signal.SIGINT, shutdown_handler)
 signal.signal(signal.SIGTERM, shutdown_handler)
 
+# -----------------------------------------------------------------------------
+# Shared HTTP Session
+# -----------------------------------------------------------------------------
+# Created in main() and reused by every webhook and Pushover request, so repeat
+# calls share pooled keep-alive connections instead of a new TCP/TLS handshake each
+_SESSION: Optional[aiohttp.ClientSession] = None
+
+def create_session() -> aiohttp.ClientSession:
+    """
+    Creates the shared aiohttp session with a pooled connector and DNS cache.
+
+    Idle connections are kept for 60 seconds (aiohttp's default is 15), so in
+    --serve mode jobs arriving a little apart still reuse the open connection.
+    """
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=16, ttl_dns_cache=300, keepalive_timeout=60),
+        timeout=aiohttp.ClientTimeout(total=30)
+    )
+
 # -----------------------------------------------------------------------------
 # Function: send_pushover_notification_async
 # -----------------------------------------------------------------------------
@@ -369,30 +714,25 @@ async def send_pushover_notification_async(
         priority (int, optional): The priority level of the notification.
         sound (str, optional): The sound to play with the notification.
     """
-    pushover_token = os.getenv('PUSHOVER_TOKEN')
-    pushover_user = os.getenv('PUSHOVER_USER')
-    pushover_priority = config['ttd_transcribed_Pushover'].get('priority', 0)
-    pushover_sound = config['ttd_transcribed_Pushover'].get('sound', 'pushover')
-
-    if not pushover_token or not pushover_user:
+    if not settings.pushover_payload["token"] or not settings.pushover_payload["user"]:
         logger.warning("Pushover credentials not set. Cannot send notification.", extra={'unique_id': 'N/A'})
         return
 
-    payload = {
-        "token": pushover_token,
-        "user": pushover_user,
-        "message": message,
-        "title": title,
-        "priority": priority if priority else pushover_priority,
-        "sound": sound if sound else pushover_sound
-    }
+    payload = {**settings.pushover_payload, "message": message, "title": title}
+    if priority:
+        payload["priority"] = priority
+    if sound:
+        payload["sound"] = sound
+
+    if _SESSION is None:
+        logger.warning("HTTP session not initialized. Cannot send notification.", extra={'unique_id': 'N/A'})
+        return
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post("https://api.pushover.net/1/messages.json", data=payload) as response:
-                response.raise_for_status()
-                logger.info(f"Pushover notification sent successfully: {title}", extra={'unique_id': 'N/A'})
-    except aiohttp.ClientError as e:
+        async with _SESSION.post("https://api.pushover.net/1/messages.json", data=payload) as response:
+            response.raise_for_status()
+            logger.info("Pushover notification sent successfully: %s", title, extra={'unique_id': 'N/A'})
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         log_error(f"Failed to send Pushover notification: {e}", unique_id='N/A')
 
 # -----------------------------------------------------------------------------
@@ -418,11 +758,11 @@ async def send_webhook(
     Returns:
         bool: True if the webhook was sent successfully, False otherwise.
     """
-    webhook_url = config['ttd_transcribed_Webhook']['ttd_transcribed_url']
-    base_audio_url = config['ttd_transcribed_Webhook']['base_audio_url']
-    timeout_seconds = config['ttd_transcribed_Webhook'].get('timeout_seconds', 10)
-    retry_limit = config['ttd_transcribed_Webhook'].get('retry_limit', 3)
-    initial_retry_delay = config['ttd_transcribed_Webhook'].get('retry_delay', 5)
+    webhook_url = settings.webhook_url
+    base_audio_url = settings.base_audio_url
+    timeout_seconds = settings.timeout_seconds
+    retry_limit = settings.retry_limit
+    initial_retry_delay = settings.retry_delay
 
     file_name = os.path.basename(mp3_file)
     file_url = f"{base_audio_url}{file_name}"
@@ -435,23 +775,27 @@ async def send_webhook(
             "url_title": file_name
         }
     }
+    # Serialized once for every attempt, with orjson when it is installed
+    body = orjson.dumps(payload) if orjson is not None else json.dumps(payload, separators=(',', ':')).encode('utf-8')
 
     attempt = 0
     backoff = initial_retry_delay
 
     while attempt < retry_limit:
         try:
-            async with session.post(webhook_url, json=payload, timeout=timeout_seconds) as response:
+            async with session.post(
+                webhook_url, data=body, headers={'Content-Type': 'application/json'}, timeout=timeout_seconds
+            ) as response:
                 response.raise_for_status()
-                logger.info(f"Webhook sent successfully for {file_name}.", extra={'unique_id': unique_id})
+                logger.info("Webhook sent successfully for %s.", file_name, extra={'unique_id': unique_id})
                 log_task(f"Webhook sent successfully for {file_name}.", unique_id=unique_id)
                 return True
         except (aiohttp.ClientError, asyncio.TimeoutError) as e:
-            logger.error(f"Failed to send webhook for {file_name}: {e}", exc_info=True, extra={'unique_id': unique_id})
+            logger.error("Failed to send webhook for %s: %s", file_name, e, exc_info=True, extra={'unique_id': unique_id})
             attempt += 1
             if attempt < retry_limit:
                 backoff_time = min(backoff * 2 ** (attempt - 1), 60)
-                logger.info(f"Retrying webhook in {backoff_time} seconds...", extra={'unique_id': unique_id})
+                logger.info("Retrying webhook in %s seconds...", backoff_time, extra={'unique_id': unique_id})
                 await asyncio.sleep(backoff_time)
             else:
                 break
@@ -462,159 +806,280 @@ async def send_webhook(
         message=f"Failed to send webhook for {file_name} after {retry_limit} attempts.",
         priority=1
     )
-    logger.error(f"Webhook failed after {retry_limit} attempts.", extra={'unique_id': unique_id})
+    logger.error("Webhook failed after %s attempts.", retry_limit, extra={'unique_id': unique_id})
     return False
 
+# -----------------------------------------------------------------------------
+# Function: resolve_audio_path
+# -----------------------------------------------------------------------------
+def resolve_audio_path(mp3_file: str) -> Tuple[str, str, str, str]:
+    """
+    Normalizes an MP3 file argument and resolves every path derived from it.
+
+    Args:
+        mp3_file (str): The MP3 file as given on the command line (includes 'audio/' directory).
+
+    Returns:
+        Tuple[str, str, str, str]: The normalized file name, the full audio path, the
+        unique identifier (the file name without the '.mp3' extension), and the
+        transcript file path.
+    """
+    base_path = settings.base_path
+
+    # Ensure .mp3 extension is present
+    if not mp3_file.lower().endswith('.mp3'):
+        mp3_file += '.mp3'
+
+    # Normalize mp3_file to remove redundant separators
+    mp3_file = os.path.normpath(mp3_file)
+
+    # Construct full audio path without duplicating 'audio'
+    full_audio_path = os.path.normpath(os.path.join(base_path, mp3_file))
+
+    # Set unique_id to the original MP3 filename without the '.mp3' extension
+    unique_id = os.path.splitext(os.path.basename(mp3_file))[0]
+
+    # Transcript is saved with original filename (without .mp3) and .txt extension
+    transcript_file_path = os.path.join(settings.transcript_dir, f"{unique_id}.txt")
+    return mp3_file, full_audio_path, unique_id, transcript_file_path
+
+# -----------------------------------------------------------------------------
+# Function: preload_audio
+# -----------------------------------------------------------------------------
+def preload_audio(full_audio_path: str) -> Optional[np.ndarray]:
+    """
+    Decodes an audio file to the 16 kHz mono samples faster-whisper expects.
+
+    Run in worker threads from main() so every file is decoded before its turn
+    on the model.
+
+    Args:
+        full_audio_path (str): The path to the audio file.
+
+    Returns:
+        Optional[np.ndarray]: The float32 samples, or None if the file is missing
+        or could not be decoded (process_file then reports the error).
+    """
+    try:
+        return decode_audio(full_audio_path)
+    except FileNotFoundError:
+        # PyAV's file-not-found error subclasses the built-in one
+        return None
+    except Exception as e:
+        logger.warning("Failed to preload %s: %s", full_audio_path, e, extra={'unique_id': 'N/A'})
+        return None
+
 # -----------------------------------------------------------------------------
 # Function: transcribe_audio
 # -----------------------------------------------------------------------------
-def transcribe_audio(mp3_file: str, department: str, unique_id: str) -> Dict[str, Any]:
+def transcribe_audio(
+    mp3_file: str,
+    department: str,
+    unique_id: str,
+    audio: Optional[np.ndarray] = None,
+    transcript_file_path: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Transcribes an audio file using Whisper AI and logs performance metrics.
+
+    With transcript_file_path, each segment is written as soon as it is decoded,
+    through a 1 MiB buffer, to a '.part' file that replaces the transcript only
+    once decoding has finished. An interrupted run therefore never leaves a
+    partial transcript that transcript_is_current would treat as done, and the
+    '.part' file is removed if decoding or the write fails.
     
     Args:
         mp3_file (str): The path to the MP3 file to transcribe.
         department (str): The department associated with the audio.
         unique_id (str): The unique identifier for the task.
+        audio (np.ndarray, optional): Samples already decoded by preload_audio.
+        transcript_file_path (str, optional): Where to save the transcript.
     
     Returns:
         Dict[str, Any]: A dictionary containing the transcription text and duration.
     """
-    initial_prompt = config['ttd_transcribed_Whisper']['initial_prompts'].get(
+    initial_prompt = settings.initial_prompts.get(
         department, "General emergency dispatch communication."
     )
     duration: float = 0.0
 
     try:
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         log_system_usage(unique_id)
 
-        logger.info(f"Starting transcription for {mp3_file}", extra={'unique_id': unique_id})
-        result = model.transcribe(
-            mp3_file,
-            temperature=config['ttd_transcribed_Whisper']['temperature'],
-            language=config['ttd_transcribed_Whisper']['language'],
-            beam_size=config['ttd_transcribed_Whisper']['beam_size'],
-            best_of=config['ttd_transcribed_Whisper']['best_of'],
-            no_speech_threshold=config['ttd_transcribed_Whisper']['no_speech_threshold'],
-            compression_ratio_threshold=config['ttd_transcribed_Whisper']['compression_ratio_threshold'],
-            logprob_threshold=config['ttd_transcribed_Whisper']['logprob_threshold'],
+        logger.info("Starting transcription for %s", mp3_file, extra={'unique_id': unique_id})
+        segments, _ = get_transcriber().transcribe(
+            audio if audio is not None else mp3_file,
             initial_prompt=initial_prompt,
-            condition_on_previous_text=config['ttd_transcribed_Whisper']['condition_on_previous_text'],
-            verbose=config['ttd_transcribed_Whisper']['verbose'],
-            task=config['ttd_transcribed_Whisper']['task']
+            **transcribe_kwargs
         )
-
-        end_time = datetime.now()
-        duration = (end_time - start_time).total_seconds()
+        # segments is a generator; decoding happens as it is consumed
+        texts: List[str] = []
+        if transcript_file_path is None:
+            texts.extend(segment.text for segment in segments)
+        else:
+            partial_path = f"{transcript_file_path}.part"
+            try:
+                with open(partial_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                    for segment in segments:
+                        texts.append(segment.text)
+                        f.write(segment.text)
+                os.replace(partial_path, transcript_file_path)
+            except BaseException:
+                # Decoding or the write failed; don't leave the partial file behind
+                try:
+                    os.remove(partial_path)
+                except OSError:
+                    pass
+                raise
+        text = "".join(texts)
+
+        duration = time.perf_counter() - start_time
         log_task(f"Transcription completed in {duration:.2f} seconds for {mp3_file}", unique_id)
         log_system_usage(unique_id)
-        return {'text': result['text'], 'duration': duration}
+        return {'text': text, 'duration': duration}
     except Exception as e:
-        logger.error(f"Failed to transcribe {mp3_file}: {e}", exc_info=True, extra={'unique_id': unique_id})
+        logger.error("Failed to transcribe %s: %s", mp3_file, e, exc_info=True, extra={'unique_id': unique_id})
         log_error(f"Failed to transcribe {mp3_file}: {e}", unique_id)
         raise
 
+# -----------------------------------------------------------------------------
+# Function: read_transcript
+# -----------------------------------------------------------------------------
+def read_transcript(transcript_file_path: str) -> str:
+    """
+    Reads a saved UTF-8 transcript; run in an executor from process_file.
+
+    Args:
+        transcript_file_path (str): The path of the transcript file.
+
+    Returns:
+        str: The transcribed text.
+    """
+    with open(transcript_file_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def transcript_is_current(transcript_file_path: str, full_audio_path: str) -> bool:
+    """
+    Checks whether a transcript was written after its audio file last changed.
+
+    Used to skip re-transcribing an MP3 that is dropped again for a retry.
+
+    Args:
+        transcript_file_path (str): The path of the transcript file.
+        full_audio_path (str): The path of the MP3 file it was made from.
+
+    Returns:
+        bool: True if the transcript exists and is newer than the audio file.
+    """
+    try:
+        return os.stat(transcript_file_path).st_mtime > os.stat(full_audio_path).st_mtime
+    except OSError:
+        return False
+
 # -----------------------------------------------------------------------------
 # Async Function: process_file
 # -----------------------------------------------------------------------------
-async def process_file(mp3_file: str, department: str) -> None:
+async def process_file(
+    mp3_file: str,
+    department: str,
+    audio: Optional[np.ndarray] = None,
+    force: bool = False
+) -> float:
     """
     Processes the MP3 file, transcribes it, saves the result, and sends it via webhook.
 
+    The transcription runs on _INFERENCE_EXECUTOR's thread, so the
+    event loop keeps sending other files' webhooks and notifications meanwhile.
+    If a transcript newer than the MP3 file already exists, it is sent as is.
+
     Args:
         mp3_file (str): The MP3 file to process (includes 'audio/' directory).
         department (str): The department associated with the audio.
-    """
-    base_path = config['ttd_transcribed_audio_Path']['base_path']
-    delete_after_process = config['ttd_transcribed_Logging']['delete_after_processing']
-    transcript_dir = os.path.join(script_dir, config['ttd_transcribed_Logging']['log_dir'], "transcripts")
-    os.makedirs(transcript_dir, exist_ok=True)
+        audio (np.ndarray, optional): Samples already decoded by preload_audio.
+        force (bool, optional): Transcribe even if a current transcript exists.
 
-    # Ensure .mp3 extension is present
-    if not mp3_file.lower().endswith('.mp3'):
-        mp3_file += '.mp3'
-
-    # Normalize mp3_file to remove redundant separators
-    mp3_file = os.path.normpath(mp3_file)
-
-    # Construct full audio path without duplicating 'audio'
-    full_audio_path = os.path.normpath(os.path.join(base_path, mp3_file))
+    Returns:
+        float: The transcription duration in seconds (0.0 if it did not complete).
+    """
+    base_path = settings.base_path
+    delete_after_process = settings.delete_after_processing
+    os.makedirs(settings.transcript_dir, exist_ok=True)
 
-    # Set unique_id to the original MP3 filename without the '.mp3' extension
-    unique_id = os.path.splitext(os.path.basename(mp3_file))[0]
+    mp3_file, full_audio_path, unique_id, transcript_file_path = resolve_audio_path(mp3_file)
     duration: float = 0.0
 
     try:
-        logger.debug(f"Base path: {base_path}", extra={'unique_id': unique_id})
-        logger.debug(f"Full audio path: {full_audio_path}", extra={'unique_id': unique_id})
+        logger.debug("Base path: %s", base_path, extra={'unique_id': unique_id})
+        logger.debug("Full audio path: %s", full_audio_path, extra={'unique_id': unique_id})
 
-        if not os.path.isfile(full_audio_path):
+        # Decoded samples prove the file was there; only check when there are none
+        if audio is None and not os.path.isfile(full_audio_path):
             raise FileNotFoundError(f"MP3 file not found: {full_audio_path}")
 
-        transcription_result = transcribe_audio(full_audio_path, department, unique_id)
-        transcription = transcription_result['text']
-        duration = transcription_result['duration']
+        loop = asyncio.get_running_loop()
 
-        # Save transcript with original filename (without .mp3) and .txt extension
-        transcript_file_path = os.path.join(transcript_dir, f"{unique_id}.txt")
-        async with aiofiles.open(transcript_file_path, 'w') as f:
-            await f.write(transcription)
-        log_task(f"Transcription saved to: {transcript_file_path}", unique_id)
+        if not force and transcript_is_current(transcript_file_path, full_audio_path):
+            transcription = await loop.run_in_executor(None, read_transcript, transcript_file_path)
+            log_task(f"Reusing existing transcript: {transcript_file_path}", unique_id)
+        else:
+            transcription_result = await loop.run_in_executor(
+                _INFERENCE_EXECUTOR, transcribe_audio,
+                full_audio_path, department, unique_id, audio, transcript_file_path
+            )
+            transcription = transcription_result['text']
+            duration = transcription_result['duration']
+            log_task(f"Transcription saved to: {transcript_file_path}", unique_id)
 
         # Send the transcription via webhook
-        async with aiohttp.ClientSession() as session:
-            success = await send_webhook(mp3_file, department, transcription, session, unique_id)
-            if success and delete_after_process:
-                os.remove(full_audio_path)
-                log_task(f"Deleted processed file: {full_audio_path}", unique_id)
+        success = await send_webhook(mp3_file, department, transcription, _SESSION, unique_id)
+        if success and delete_after_process:
+            await loop.run_in_executor(None, os.remove, full_audio_path)
+            log_task(f"Deleted processed file: {full_audio_path}", unique_id)
 
     except Exception as e:
-        logger.error(f"Error processing file: {unique_id}: {e}", exc_info=True, extra={'unique_id': unique_id})
+        logger.error("Error processing file: %s: %s", unique_id, e, exc_info=True, extra={'unique_id': unique_id})
         log_error(f"Error processing {unique_id}: {e}", unique_id)
         await send_pushover_notification_async("Script Error", f"Error processing {unique_id}: {e}", priority=1)
 
-    finally:
-        # Ensure that grouped notifications are sent even if an error occurs
-        await send_grouped_pushover_notifications(duration, unique_id)
-        # Clear notifications after sending to prevent duplication
-        task_notifications.clear()
-        error_notifications.clear()
+    return duration
 
 # -----------------------------------------------------------------------------
 # Function: send_grouped_pushover_notifications
 # -----------------------------------------------------------------------------
 async def send_grouped_pushover_notifications(duration: float, unique_id: str) -> None:
     """
-    Sends grouped Pushover notifications for tasks and errors.
+    Sends the run's task and error notifications as a single Pushover message.
+
+    Tasks and errors share one POST; the message is sent at high priority
+    whenever any errors were collected.
 
     Args:
         duration (float): The duration of the transcription process in seconds.
         unique_id (str): The unique identifier for the task.
     """
+    if not task_notifications and not error_notifications:
+        return
+
+    sections = []
     if task_notifications:
         timestamp = datetime.now().isoformat()
-        detailed_message = f"""Transcription Task Summary
+        sections.append(f"""Transcription Task Summary
 From Audio Workflow on {timestamp}
 Task Summary:
 - Timestamp: {timestamp}
 - Duration: {duration:.2f} seconds
 - Tasks:
-{chr(10).join(task_notifications)}
-"""
-        await send_pushover_notification_async(
-            title="Transcription Task Summary",
-            message=detailed_message.strip(),
-            priority=-1  # Low priority for normal activity
-        )
+{chr(10).join(task_notifications)}""")
 
     if error_notifications:
-        detailed_error = "\n".join(error_notifications)
-        await send_pushover_notification_async(
-            title="Transcription Errors",
-            message=detailed_error,
-            priority=1  # Higher priority for errors
-        )
+        sections.append("Errors:\n" + "\n".join(error_notifications))
+
+    await send_pushover_notification_async(
+        title="Transcription Errors" if error_notifications else "Transcription Task Summary",
+        message="\n\n".join(sections),
+        priority=1 if error_notifications else -1  # Higher priority for errors, low for normal activity
+    )
 
 # -----------------------------------------------------------------------------
 # Function: detect_anomalies
@@ -623,16 +1088,15 @@ def detect_anomalies() -> None:
     """
     Detects anomalies based on predefined thresholds and logs alerts.
     """
-    process = psutil.Process(os.getpid())
-    memory_usage_mb = process.memory_info().rss / (1024 * 1024)
-    cpu_usage = process.cpu_percent(interval=1.5)
+    memory_usage_mb = _PROC.memory_info().rss / (1024 * 1024)
+    cpu_usage = _PROC.cpu_percent(interval=None)
 
     # Example thresholds
     MEMORY_THRESHOLD_MB = 2000  # 2 GB
     CPU_THRESHOLD_PERCENT = 80.0  # 80%
 
     if memory_usage_mb > MEMORY_THRESHOLD_MB:
-        logger.warning(f"High memory usage detected: {memory_usage_mb:.2f} MB", extra={'unique_id': 'N/A'})
+        logger.warning("High memory usage detected: %.2f MB", memory_usage_mb, extra={'unique_id': 'N/A'})
         asyncio.create_task(send_pushover_notification_async(
             title="High Memory Usage",
             message=f"Memory usage is at {memory_usage_mb:.2f} MB, which exceeds the threshold of {MEMORY_THRESHOLD_MB} MB.",
@@ -640,7 +1104,7 @@ def detect_anomalies() -> None:
         ))
 
     if cpu_usage > CPU_THRESHOLD_PERCENT:
-        logger.warning(f"High CPU usage detected: {cpu_usage:.2f}%", extra={'unique_id': 'N/A'})
+        logger.warning("High CPU usage detected: %.2f%%", cpu_usage, extra={'unique_id': 'N/A'})
         asyncio.create_task(send_pushover_notification_async(
             title="High CPU Usage",
             message=f"CPU usage is at {cpu_usage:.2f}%, which exceeds the threshold of {CPU_THRESHOLD_PERCENT}%.",
@@ -670,6 +1134,125 @@ def transcribe_audio_with_anomaly_detection(mp3_file: str, department: str, uniq
     
     return transcription_result
 
+# -----------------------------------------------------------------------------
+# Async Function: run_job
+# -----------------------------------------------------------------------------
+async def run_job(mp3_file: str, department: str, force: bool = False) -> float:
+    """
+    Decodes one MP3 file in a worker thread, then processes it.
+
+    The decode runs in the default executor, so it overlaps with whatever the model
+    is transcribing. A file whose transcript is already current is not decoded;
+    process_file reuses the transcript.
+
+    Args:
+        mp3_file (str): The MP3 file to process (includes 'audio/' directory).
+        department (str): The department associated with the audio.
+        force (bool, optional): Transcribe even if a current transcript exists.
+
+    Returns:
+        float: The transcription duration in seconds (0.0 if it did not complete).
+    """
+    _, full_audio_path, _, transcript_file_path = resolve_audio_path(mp3_file)
+    audio = None
+    if force or not transcript_is_current(transcript_file_path, full_audio_path):
+        audio = await asyncio.get_running_loop().run_in_executor(None, preload_audio, full_audio_path)
+    return await process_file(mp3_file, department, audio, force)
+
+# -----------------------------------------------------------------------------
+# Async Function: flush_notifications
+# -----------------------------------------------------------------------------
+async def flush_notifications(durations: List[float]) -> None:
+    """
+    Sends the grouped Pushover notification and drops what it covered.
+
+    Only the entries present when the flush started are removed, so
+    notifications added by jobs that finish during the send are kept for the
+    next flush.
+
+    Args:
+        durations (List[float]): Transcription durations since the last flush;
+            emptied once sent.
+    """
+    task_count, error_count, duration_count = len(task_notifications), len(error_notifications), len(durations)
+    await send_grouped_pushover_notifications(sum(durations), 'N/A')
+    del task_notifications[:task_count]
+    del error_notifications[:error_count]
+    del durations[:duration_count]
+
+# -----------------------------------------------------------------------------
+# Async Function: serve
+# -----------------------------------------------------------------------------
+async def serve() -> None:
+    """
+    Runs as a daemon, transcribing files submitted over HTTP.
+
+    The model, HTTP session and inference thread are created once and shared by every
+    job, so each request only pays for decoding and inference. Jobs are posted
+    as JSON ({"mp3_file": ..., "department": ..., "force": false}) to
+    POST /transcribe, which answers 202 once the job is queued. Grouped Pushover
+    notifications and log cleanup run every notification_interval seconds, and
+    SIGHUP reloads the configuration (see reload_settings).
+    """
+    global _SESSION
+
+    durations: List[float] = []
+    # Strong references keep running jobs from being garbage collected
+    jobs: set = set()
+
+    async def run_and_record(mp3_file: str, department: str, force: bool) -> None:
+        durations.append(await run_job(mp3_file, department, force))
+
+    async def handle_transcribe(request: web.Request) -> web.Response:
+        try:
+            job = await request.json()
+            mp3_file, department = str(job['mp3_file']), str(job['department'])
+        except (ValueError, KeyError, TypeError):
+            return web.json_response({'error': "expected JSON with 'mp3_file' and 'department'"}, status=400)
+
+        task = asyncio.create_task(run_and_record(mp3_file, department, bool(job.get('force', False))))
+        jobs.add(task)
+        task.add_done_callback(jobs.discard)
+        unique_id = resolve_audio_path(mp3_file)[2]
+        logger.info("Queued %s (%s).", mp3_file, department, extra={'unique_id': unique_id})
+        return web.json_response({'status': 'queued', 'unique_id': unique_id}, status=202)
+
+    async def housekeeping() -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await loop.run_in_executor(None, cleanup_logs)
+            await asyncio.sleep(settings.notification_interval)
+            await flush_notifications(durations)
+
+    # Load the model before accepting jobs, so the first one doesn't wait for it
+    await asyncio.get_running_loop().run_in_executor(_INFERENCE_EXECUTOR, get_transcriber)
+
+    if hasattr(signal, 'SIGHUP'):
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, reload_settings)
+
+    app = web.Application()
+    app.router.add_post('/transcribe', handle_transcribe)
+    runner = web.AppRunner(app)
+
+    async with create_session() as session:
+        _SESSION = session
+        housekeeping_task = asyncio.create_task(housekeeping())
+        try:
+            await runner.setup()
+            await web.TCPSite(runner, settings.server_host, settings.server_port).start()
+            logger.info(
+                "Listening for transcription jobs on http://%s:%s/transcribe",
+                settings.server_host, settings.server_port, extra={'unique_id': 'N/A'}
+            )
+            await asyncio.Event().wait()
+        finally:
+            housekeeping_task.cancel()
+            await runner.cleanup()
+            if jobs:
+                await asyncio.gather(*jobs, return_exceptions=True)
+            await flush_notifications(durations)
+            _SESSION = None
+
 # -----------------------------------------------------------------------------
 # Main Execution
 # -----------------------------------------------------------------------------
@@ -677,37 +1260,75 @@ async def main() -> None:
     """
     Main function that handles script execution: parsing arguments, processing files, etc.
     """
+    global _SESSION
+
     logger.debug("Starting ttd_transcribed script.", extra={'unique_id': 'N/A'})
 
     # Use argparse to handle command-line arguments
     parser = argparse.ArgumentParser(description="Transcribe audio files and send the result via webhook.")
-    parser.add_argument("mp3_file", type=str, help="The MP3 file to transcribe (includes 'audio/' directory).")
-    parser.add_argument("department", type=str, help="The department the file belongs to.")
+    parser.add_argument(
+        "files", nargs='*', metavar="MP3_FILE DEPARTMENT",
+        help="One or more pairs of an MP3 file to transcribe (includes 'audio/' directory) "
+             "and the department it belongs to."
+    )
     parser.add_argument("--log-level", type=str, help="Set the logging level (e.g., DEBUG, INFO).")
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Transcribe again even if a transcript newer than the MP3 file exists."
+    )
+    parser.add_argument(
+        "--serve", action="store_true",
+        help="Keep the model loaded and accept jobs over HTTP (see ttd_transcribed_client.py)."
+    )
 
     args = parser.parse_args()
+    if not args.serve and not args.files:
+        parser.error("at least one MP3 file and department are required unless --serve is given.")
+    if len(args.files) % 2:
+        parser.error("each MP3 file must be followed by its department.")
+    jobs = list(zip(args.files[0::2], args.files[1::2]))
 
     # Override log level if specified
     if args.log_level:
         new_log_level = getattr(logging, args.log_level.upper(), logging.DEBUG)
         logger.setLevel(new_log_level)
-        for handler in logger.handlers:
+        for handler in logger.handlers + list(_LOG_LISTENER.handlers):
             handler.setLevel(new_log_level)
-        logger.info(f"Logging level changed to {args.log_level.upper()}.", extra={'unique_id': 'N/A'})
+        logger.info("Logging level changed to %s.", args.log_level.upper(), extra={'unique_id': 'N/A'})
+
+    if args.serve:
+        await serve()
+        return
 
-    # Process the file with department name included
-    await process_file(args.mp3_file, args.department)
+    # Log cleanup runs in a worker thread alongside the jobs
+    cleanup = asyncio.get_running_loop().run_in_executor(None, cleanup_logs)
+
+    # Process the files concurrently over one shared session. Every file is
+    # decoded up front in parallel worker threads, and transcriptions queue on
+    # _INFERENCE_EXECUTOR while earlier files' webhooks are still being sent.
+    async with create_session() as session:
+        _SESSION = session
+        durations: List[float] = []
+        try:
+            durations = await asyncio.gather(
+                *(run_job(mp3_file, department, args.force) for mp3_file, department in jobs)
+            )
+        finally:
+            await cleanup
+            # Ensure that grouped notifications are sent even if an error occurs
+            await flush_notifications(list(durations))
+            _SESSION = None
 
 if __name__ == "__main__":
     try:
         asyncio.run(main())
     except Exception as e:
-        logger.error(f"Unexpected error in main execution: {e}", exc_info=True, extra={'unique_id': 'N/A'})
+        logger.error("Unexpected error in main execution: %s", e, exc_info=True, extra={'unique_id': 'N/A'})
     finally:
         if GPU_AVAILABLE:
             try:
                 pynvml.nvmlShutdown()
                 logger.info("pynvml shutdown successfully.", extra={'unique_id': 'N/A'})
             except pynvml.NVMLError as e:
-                logger.error(f"Error shutting down pynvml: {e}", extra={'unique_id': 'N/A'})
+                logger.error("Error shutting down pynvml: %s", e, extra={'unique_id': 'N/A'})
         logger.info("Script terminated.", extra={'unique_id': 'N/A'})
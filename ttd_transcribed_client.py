@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script Name: ttd_transcribed_client.py
+Version: v1.0.0
+Author: Quentin King
+Creation Date: 10-16-2026
+Last Updated: 10-16-2026
+Description:
+Submits MP3 file / department pairs to a running `ttd_transcribed.py --serve`
+daemon. Takes the same arguments as ttd_transcribed.py, but returns as soon as
+the daemon has queued the jobs, without loading the Whisper model itself.
+
+Changelog:
+v1.0.0 - 10-16-2026
+- Initial version.
+"""
+
+import os
+import sys
+import json
+import argparse
+import urllib.request
+import urllib.error
+
+# -----------------------------------------------------------------------------
+# Configuration Paths
+# -----------------------------------------------------------------------------
+script_dir = os.path.dirname(os.path.abspath(__file__))
+config_path = os.path.join(script_dir, 'ttd_transcribed_config.json')
+
+# -----------------------------------------------------------------------------
+# Function: get_server_url
+# -----------------------------------------------------------------------------
+def get_server_url() -> str:
+    """
+    Builds the daemon's job URL from the ttd_transcribed_Server config section.
+
+    Returns:
+        str: The URL to POST jobs to.
+    """
+    with open(config_path, 'r') as f:
+        server_config = json.load(f).get('ttd_transcribed_Server', {})
+    host = server_config.get('host', '127.0.0.1')
+    port = server_config.get('port', 8766)
+    return f"http://{host}:{port}/transcribe"
+
+# -----------------------------------------------------------------------------
+# Function: submit_job
+# -----------------------------------------------------------------------------
+def submit_job(url: str, mp3_file: str, department: str, force: bool) -> str:
+    """
+    Posts one job to the daemon.
+
+    Args:
+        url (str): The daemon's job URL.
+        mp3_file (str): The MP3 file to transcribe (includes 'audio/' directory).
+        department (str): The department the file belongs to.
+        force (bool): Transcribe even if a current transcript exists.
+
+    Returns:
+        str: The unique identifier the daemon assigned to the job.
+    """
+    body = json.dumps(
+        {'mp3_file': mp3_file, 'department': department, 'force': force}, separators=(',', ':')
+    ).encode('utf-8')
+    request = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.load(response)['unique_id']
+
+# -----------------------------------------------------------------------------
+# Main Execution
+# -----------------------------------------------------------------------------
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Queue audio files on the ttd_transcribed daemon.")
+    parser.add_argument(
+        "files", nargs='+', metavar="MP3_FILE DEPARTMENT",
+        help="One or more pairs of an MP3 file to transcribe (includes 'audio/' directory) "
+             "and the department it belongs to."
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Transcribe again even if a transcript newer than the MP3 file exists."
+    )
+    args = parser.parse_args()
+    if len(args.files) % 2:
+        parser.error("each MP3 file must be followed by its department.")
+
+    url = get_server_url()
+    status = 0
+    for mp3_file, department in zip(args.files[0::2], args.files[1::2]):
+        try:
+            unique_id = submit_job(url, mp3_file, department, args.force)
+            print(f"Queued {mp3_file} as {unique_id}")
+        except (urllib.error.URLError, OSError, ValueError, KeyError) as e:
+            print(f"Failed to queue {mp3_file}: {e}", file=sys.stderr)
+            status = 1
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())